@@ -3,6 +3,7 @@ from Autodesk.Revit import DB
 from flamingo.revit import (
     GetViewPhase,
     GetElementRooms,
+    GetElementRoomsBatch,
     SetParameter,
     GetScheduledParameterIds,
     GetScheduledParameterByName,
@@ -311,9 +312,7 @@ def SetCOBieComponentSpace(element, phase, blankOnly, doc=None):
         if not rooms:
             LOGGER.debug("No room found")
             return
-        roomNumbers = ", ".join([room.Number for room in rooms])
-        if SetCOBieParameter(element, "COBie.Component.Space", roomNumbers):
-            LOGGER.info("{} -> {}".format(OUTPUT.linkify(element.Id), roomNumbers))
+        _SetCOBieComponentSpaceFromRooms(element, rooms)
     except Exception as e:
         LOGGER.warn("Error: {}".format(e))
         return
@@ -321,6 +320,56 @@ def SetCOBieComponentSpace(element, phase, blankOnly, doc=None):
     return element
 
 
+def SetCOBieComponentSpaces(elements, phase, blankOnly, doc=None):
+    """Same as SetCOBieComponentSpace for many elements at once. The rooms are
+    read and indexed once for the whole list, rather than searched again for
+    every element.
+
+    Args:
+        elements (list[DB.Element]): Elements listed in the COBie.Components
+            schedule
+        phase (DB.Phase): Phase of the rooms to match
+        blankOnly (bool): If true, only update values that are currently blank
+        doc (DB.Document, optional): Document the elements and rooms are in.
+            Defaults to None.
+
+    Returns:
+        list[DB.Element]: Elements that were matched to a room
+    """
+    LOGGER.debug("SetCOBieComponentSpaces")
+    if doc is None:
+        doc = HOST_APP.doc
+
+    if blankOnly:
+        elements = [
+            element
+            for element in elements
+            if COBieParameterIsBlank(element, "COBie.Component.Space")
+        ]
+    else:
+        elements = list(elements)
+    elementRooms = GetElementRoomsBatch(elements, phase, offset=1, doc=doc)
+    outElements = []
+    for element, rooms in zip(elements, elementRooms):
+        if not rooms:
+            LOGGER.debug("No room found")
+            continue
+        try:
+            _SetCOBieComponentSpaceFromRooms(element, rooms)
+        except Exception as e:
+            LOGGER.warn("Error: {}".format(e))
+            continue
+        outElements.append(element)
+    LOGGER.debug("SetCOBieComponentSpaces: Complete")
+    return outElements
+
+
+def _SetCOBieComponentSpaceFromRooms(element, rooms):
+    roomNumbers = ", ".join([room.Number for room in rooms])
+    if SetCOBieParameter(element, "COBie.Component.Space", roomNumbers):
+        LOGGER.info("{} -> {}".format(OUTPUT.linkify(element.Id), roomNumbers))
+
+
 def COBieComponentSetDescription(elements, blankOnly=True, skipGrouped=True, doc=None):
     LOGGER.debug("COBieComponentSetDescription")
 
@@ -0,0 +1,47 @@
+import re
+
+# Lines that do not match the combined keyword pattern cannot match any of the
+# individual journal line patterns
+_KEYWORD_REGEX = re.compile(
+    r"'C |\"DetachCheckBox\", \"True\"|Jrn\.Data \"File Name\"|>Open:Local|\"\[|"
+    r"openFromModelPath"
+)
+_COMMAND_REGEX = re.compile(r"'C (.*);\s+(.*)")
+_OPEN_LOCAL_REGEX = re.compile(r'>Open:Local.*".+\\(.+)"')
+_BRACKET_PATH_REGEX = re.compile(r'"\[(.*)\]"')
+_OPEN_FROM_MODEL_PATH_REGEX = re.compile(r"openFromModelPath.+\[(.*)\]")
+
+
+def ClassifyJournalLine(line):
+    """Work out what a Revit journal line records. The checks run in a fixed
+    order and the first one that matches wins, so a line holding several
+    keywords is always classified the same way.
+
+    Args:
+        line (str): Line from a Revit journal file
+
+    Returns:
+        tuple: Line type and the regex match holding its values. The line type
+            is one of "command", "detach", "fileName", "openLocal", "bracket"
+            or "openFromModelPath", or None when the line records none of
+            them. The match is None for line types without values.
+    """
+    if not line or not _KEYWORD_REGEX.search(line):
+        return None, None
+    m = "'C " in line and _COMMAND_REGEX.search(line.strip())
+    if m:
+        return "command", m
+    if '"DetachCheckBox", "True"' in line:
+        return "detach", None
+    if 'Jrn.Data "File Name"' in line:
+        return "fileName", None
+    m = ">Open:Local" in line and _OPEN_LOCAL_REGEX.search(line)
+    if m:
+        return "openLocal", m
+    m = '"[' in line and _BRACKET_PATH_REGEX.search(line)
+    if m:
+        return "bracket", m
+    m = "openFromModelPath" in line and _OPEN_FROM_MODEL_PATH_REGEX.search(line)
+    if m:
+        return "openFromModelPath", m
+    return None, None
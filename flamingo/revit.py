@@ -1,20 +1,93 @@
 from Autodesk.Revit import DB
 import codecs
+from collections import Counter
 from datetime import datetime
-from flamingo.geometry import GetMidPoint, GetSolids, MakeSolid
-from math import atan2, pi
+from flamingo.geometry import GetSolids, MakeSolid
+from flamingo.journal import ClassifyJournalLine
+import logging
+from math import floor
 from pyrevit import HOST_APP, forms, PyRevitException, revit, script
 from pyrevit.coreutils.configparser import configparser
 from os import path
 import re
 import shutil
 from string import ascii_uppercase
-from System import Guid
+from System import Array, Guid
 from System.Collections.Generic import List
 
 LOGGER = script.get_logger()
 OUTPUT = script.get_output()
 
+_UNC_REGEX = re.compile(re.escape("\\\\wha-server02\\projects"), re.IGNORECASE)
+_RVT_EXTENSION_REGEX = re.compile(r"\.rvt$", re.IGNORECASE)
+
+# File name on the line after a journal "File Name" entry
+_JOURNAL_FILE_NAME_REGEX = re.compile(r"([^\\]+?\.rvt)")
+_JOURNAL_MONTHS = {
+    "Jan": 1,
+    "Feb": 2,
+    "Mar": 3,
+    "Apr": 4,
+    "May": 5,
+    "Jun": 6,
+    "Jul": 7,
+    "Aug": 8,
+    "Sep": 9,
+    "Oct": 10,
+    "Nov": 11,
+    "Dec": 12,
+}
+
+# Size in feet of the plan grid cells used to index rooms by bounding box
+_ROOM_INDEX_CELL_SIZE = 20.0
+# Most grid cells a bounding box may cover before it skips the grid index
+_ROOM_INDEX_MAX_CELLS = 10000
+
+# Number of door marks written per sub transaction in DoorRenameByRoomNumber
+_DOOR_MARK_BATCH_SIZE = 50
+
+# Read size used when copying central models to a local file
+_LOCAL_COPY_BUFFER_SIZE = 4 * 1024 * 1024
+
+# Width in feet of the hidden meta parameter columns in note block schedules
+_META_COLUMN_WIDTH = 1 / 12.0
+
+# Parameter value getters keyed by storage type
+_PARAMETER_VALUE_GETTERS = {
+    DB.StorageType.Integer: DB.Parameter.AsInteger,
+    DB.StorageType.Double: DB.Parameter.AsDouble,
+    DB.StorageType.String: DB.Parameter.AsString,
+    DB.StorageType.ElementId: DB.Parameter.AsElementId,
+}
+
+# Category.IsVisibleInUI is not available in older versions of Revit
+_CATEGORY_HAS_IS_VISIBLE_IN_UI = hasattr(DB.Category, "IsVisibleInUI")
+
+# View tags shown for elevations, sections and callouts
+_VIEW_TAG_CATEGORY_FILTER = DB.ElementMulticategoryFilter(
+    List[DB.BuiltInCategory](
+        [DB.BuiltInCategory.OST_Viewers, DB.BuiltInCategory.OST_Elev]
+    )
+)
+
+# Phase statuses of elements shown in a view
+_VISIBLE_PHASE_STATUSES = List[DB.ElementOnPhaseStatus](
+    [DB.ElementOnPhaseStatus.New, DB.ElementOnPhaseStatus.Existing]
+)
+
+# Shared parameter definitions by group keyed by (filename, modified time)
+_SHARED_PARAMETER_DEFINITIONS = {}
+# Phases by name keyed by document hash code
+_DOCUMENT_PHASES = {}
+# Project paths read from Revit.ini keyed by (ini path, modified time)
+_REVIT_INI_PROJECT_PATHS = {}
+# Solid fill pattern ids keyed by document hash code
+_SOLID_FILL_IDS = {}
+# New or existing phase status filters keyed by (document hash code, phase id)
+_PHASE_STATUS_FILTERS = {}
+# Ids of model categories visible in the UI keyed by document hash code
+_VISIBLE_MODEL_CATEGORY_IDS = {}
+
 
 class iFamilyLoadOptions(DB.IFamilyLoadOptions):
     def OnFamilyFound(self, familyInUse, overwriteParameterValues):
@@ -29,6 +102,87 @@ class iFamilyLoadOptions(DB.IFamilyLoadOptions):
         return True
 
 
+def ClearRevitCaches(doc=None):
+    """Clear the per-document lookups cached by this module, such as phases,
+    phase status filters and the solid fill id. Call after
+    changing the model in ways those lookups depend on.
+
+    Args:
+        doc (DB.Document, optional): Document to clear from the caches.
+            Defaults to None, which clears every document.
+    """
+    documentCaches = (
+        _DOCUMENT_PHASES,
+        _SOLID_FILL_IDS,
+        _VISIBLE_MODEL_CATEGORY_IDS,
+    )
+    # Caches keyed by tuples that start with the document hash code
+    documentTupleCaches = (
+        _PHASE_STATUS_FILTERS,
+    )
+    if doc is None:
+        for cache in documentCaches + documentTupleCaches:
+            cache.clear()
+        return
+    docKey = doc.GetHashCode()
+    for cache in documentCaches:
+        cache.pop(docKey, None)
+    for cache in documentTupleCaches:
+        for cacheKey in [key for key in cache if key[0] == docKey]:
+            del cache[cacheKey]
+
+
+def _GetSharedParameterDefinitions(app):
+    """Get lookups of the definitions in the application's shared parameter file.
+    The file is only opened and read again when its path or modified time
+    changes.
+
+    Args:
+        app (Autodesk.Revit.ApplicationServices.Application): Revit application
+
+    Returns:
+        dict: Definitions keyed by Guid and definitions keyed by name as a
+            tuple(dict, dict) for each group, keyed by group name
+    """
+    sharedParametersFilename = app.SharedParametersFilename
+    try:
+        modifiedTime = path.getmtime(sharedParametersFilename)
+    except (OSError, TypeError):
+        modifiedTime = None
+    cacheKey = (sharedParametersFilename, modifiedTime)
+    if cacheKey in _SHARED_PARAMETER_DEFINITIONS:
+        return _SHARED_PARAMETER_DEFINITIONS[cacheKey]
+
+    definitionsFile = app.OpenSharedParameterFile()
+    if not definitionsFile:
+        raise PyRevitException("Could not read from the shared parameters file")
+    definitionGroups = {}
+    for definitionGroup in definitionsFile.Groups:
+        definitionsByGuid = {}
+        definitionsByName = {}
+        for definition in definitionGroup.Definitions:
+            definitionsByGuid[definition.GUID] = definition
+            definitionsByName[definition.Name] = definition
+        definitionGroups[definitionGroup.Name] = (definitionsByGuid, definitionsByName)
+    if modifiedTime is not None:
+        _SHARED_PARAMETER_DEFINITIONS[cacheKey] = definitionGroups
+    return definitionGroups
+
+
+def _GetCategories(doc, revitCategories):
+    """Get the categories of a document for a list of built in categories.
+
+    Args:
+        doc (DB.Document): Revit document
+        revitCategories (list(DB.BuiltInCategory)): Categories to look up
+
+    Returns:
+        list(DB.Category): Categories of the document
+    """
+    categories = doc.Settings.Categories
+    return [categories.get_Item(revitCategory) for revitCategory in revitCategories]
+
+
 def CreateProjectParameter(
     parameterName,
     sharedParameterGroupName,
@@ -65,25 +219,25 @@ def CreateProjectParameter(
         if path.exists(sharedParametersFilename):
             app.SharedParametersFilename = sharedParametersFilename
         else:
-            PyRevitException(
+            raise PyRevitException(
                 "Could not located specified shared parameter file at {}".format(
                     sharedParametersFilename
                 )
             )
 
     # Find the parameter in the parameters file
-    definitionsFile = app.OpenSharedParameterFile()
-    if not definitionsFile:
-        raise PyRevitException("Could not read from the shared parameters file")
-    definitionGroup = definitionsFile.Groups.get_Item(sharedParameterGroupName)
+    definitionGroups = _GetSharedParameterDefinitions(app)
+    if sharedParameterGroupName not in definitionGroups:
+        raise PyRevitException(
+            "Could not locate group in shared parameter file: {}".format(
+                sharedParameterGroupName
+            )
+        )
+    definitionsByGuid, definitionsByName = definitionGroups[sharedParameterGroupName]
     if type(parameterName) == Guid:
-        externalDefinition = None
-        for definition in definitionGroup.Definitions:
-            if definition.GUID == parameterName:
-                externalDefinition = definition
-                break
+        externalDefinition = definitionsByGuid.get(parameterName)
     else:
-        externalDefinition = definitionGroup.Definitions.get_Item(parameterName)
+        externalDefinition = definitionsByName.get(parameterName)
     if not externalDefinition:
         LOGGER.debug("No externalDefinition found")
         raise PyRevitException(
@@ -92,19 +246,17 @@ def CreateProjectParameter(
             )
         )
 
-    # Format Revit categories
-    categories = doc.Settings.Categories
-    categorySet = app.Create.NewCategorySet()
-    for revitCategory in revitCategories:
-        category = categories.get_Item(revitCategory)
-        categorySet.Insert(category)
-
     # If the document is a family we can end here
     if doc.IsFamilyDocument:
         return doc.FamilyManager.AddParameter(
             externalDefinition, parameterGroup, not isTypeParameter
         )
 
+    # Format Revit categories
+    categorySet = app.Create.NewCategorySet()
+    for category in _GetCategories(doc, revitCategories):
+        categorySet.Insert(category)
+
     # Create the parameter
     if isTypeParameter:
         newBinding = app.Create.NewTypeBinding(categorySet)
@@ -120,36 +272,36 @@ def GetParameterFromProjectInfo(doc, parameterName):
     """
     Returns a parameter value from the Project Information category by name.
     """
-    try:
-        projectInformation = (
-            DB.FilteredElementCollector(doc)
-            .OfCategory(DB.BuiltInCategory.OST_ProjectInformation)
-            .ToElements()
-        )
-        parameterValue = projectInformation[0].LookupParameter(parameterName).AsString()
-    except:
+    parameter = _GetProjectInformationParameter(doc, parameterName)
+    if parameter is None:
         return None
-    return parameterValue
+    return parameter.AsString()
 
 
 def SetParameterFromProjectInfo(doc, parameterName, parameterValue):
     """
     Set a parameter value from the Project Information category by name.
     """
-    if True:
-        # try:
-        projectInformation = (
-            DB.FilteredElementCollector(doc)
-            .OfCategory(DB.BuiltInCategory.OST_ProjectInformation)
-            .ToElements()
-        )
-        parameter = projectInformation[0].LookupParameter(parameterName)
-        parameter.Set(parameterValue)
-    # except:
-    #     return None
+    parameter = _GetProjectInformationParameter(doc, parameterName)
+    parameter.Set(parameterValue)
     return parameter
 
 
+def _GetProjectInformationParameter(doc, parameterName):
+    """Get a Project Information parameter by name. The parameter is looked up
+    on every call, as cached Parameter objects go stale once parameters are
+    added or removed or the document is closed.
+
+    Args:
+        doc (DB.Document): Revit document
+        parameterName (str): Name of the parameter
+
+    Returns:
+        DB.Parameter: Matching parameter or None if not found
+    """
+    return _GetParameterByName(doc.ProjectInformation, parameterName)
+
+
 def SetNoteBlockProperties(
     scheduleView,
     viewName,
@@ -186,29 +338,50 @@ def SetNoteBlockProperties(
     DB.ViewSchedule
         Modified note block schedule view
     """
+    # zip below would silently drop columns without a header or width
+    if headerNames and len(headerNames) != len(columnNameList):
+        raise ValueError(
+            "Expected {} header names, got {}".format(
+                len(columnNameList), len(headerNames)
+            )
+        )
+    if columnWidthList and len(columnWidthList) != len(columnNameList):
+        raise ValueError(
+            "Expected {} column widths, got {}".format(
+                len(columnNameList), len(columnWidthList)
+            )
+        )
     parameterNameList = metaParameterNameList + columnNameList
+    parameterCount = len(parameterNameList)
     if headerNames:
         headerNameList = metaParameterNameList + headerNames
+    else:
+        headerNameList = [None] * parameterCount
     if columnWidthList:
-        columnWidthList = ([1 / 12.0] * len(metaParameterNameList)) + columnWidthList
+        metaColumnWidths = [_META_COLUMN_WIDTH] * len(metaParameterNameList)
+        columnWidthList = metaColumnWidths + columnWidthList
+    else:
+        columnWidthList = [None] * parameterCount
+    metaParameterNames = set(metaParameterNameList)
     scheduleView.Name = viewName
     scheduleDefinition = scheduleView.Definition
     scheduleDefinition.ClearFields()
     schedulableFields = GetSchedulableFields(scheduleView)
     fields = {}
-    for i in range(len(parameterNameList)):
-        parameterName = parameterNameList[i]
-        if parameterName in schedulableFields:
-            schedulableField = schedulableFields[parameterName]
-            newField = scheduleDefinition.AddField(schedulableField)
-            if headerNames:
-                if headerNameList[i]:
-                    newField.ColumnHeading = headerNameList[i]
-            if parameterNameList[i] in metaParameterNameList:
-                newField.IsHidden = True
-            if columnWidthList:
-                newField.GridColumnWidth = columnWidthList[i]
-            fields[parameterNameList[i]] = newField
+    for parameterName, headerName, columnWidth in zip(
+        parameterNameList, headerNameList, columnWidthList
+    ):
+        schedulableField = schedulableFields.get(parameterName)
+        if schedulableField is None:
+            continue
+        newField = scheduleDefinition.AddField(schedulableField)
+        if headerName:
+            newField.ColumnHeading = headerName
+        if parameterName in metaParameterNames:
+            newField.IsHidden = True
+        if columnWidth is not None:
+            newField.GridColumnWidth = columnWidth
+        fields[parameterName] = newField
     return scheduleView
 
 
@@ -221,14 +394,21 @@ def GetSchedulableFields(viewSchedule):
     Returns:
         dict: Dictionary of fields that can be scheduled, keyed by field name
     """
+    # Built in parameters have no element, so only parameter elements are named
+    parameterNames = {
+        parameter.Id.IntegerValue: parameter.Name
+        for parameter in DB.FilteredElementCollector(
+            viewSchedule.Document
+        ).OfClass(DB.ParameterElement)
+    }
     fields = {}
     scheduleDefinition = viewSchedule.Definition
     for field in scheduleDefinition.GetSchedulableFields():
         parameterId = field.ParameterId
         if parameterId is not None:
-            parameter = viewSchedule.Document.GetElement(parameterId)
-            if parameter:
-                fields[parameter.Name] = field
+            parameterName = parameterNames.get(parameterId.IntegerValue)
+            if parameterName:
+                fields[parameterName] = field
     return fields
 
 
@@ -242,12 +422,10 @@ def GetScheduleFields(viewSchedule):
     Returns:
         dict: Dictionary of fields in the schedule added by field name
     """
-    fields = {}
     scheduleDefinition = viewSchedule.Definition
-    for scheduleId in scheduleDefinition.GetFieldOrder():
-        field = scheduleDefinition.GetField(scheduleId)
-        fields[field.GetName()] = field
-    return fields
+    getField = scheduleDefinition.GetField
+    fields = (getField(scheduleId) for scheduleId in scheduleDefinition.GetFieldOrder())
+    return {field.GetName(): field for field in fields}
 
 
 def PurgeUnused(doc=None):
@@ -257,45 +435,68 @@ def PurgeUnused(doc=None):
     performanceAdviser = DB.PerformanceAdviser.GetPerformanceAdviser()
     guid = Guid(purgeGuid)
     ruleId = None
-    allRuleIds = performanceAdviser.GetAllRuleIds()
-    for rule in allRuleIds:
+    for rule in performanceAdviser.GetAllRuleIds():
         # Finds the PerformanceAdviserRuleId for the purge command
-        if str(rule.Guid) == purgeGuid:
+        if rule.Guid == guid:
             ruleId = rule
+            break
+    if ruleId is None:
+        raise PyRevitException("Could not locate the purge performance adviser rule")
     ruleIds = List[DB.PerformanceAdviserRuleId]([ruleId])
-    for i in range(4):
-        # Executes the purge
-        failureMessages = performanceAdviser.ExecuteRules(doc, ruleIds)
-        if failureMessages.Count > 0:
-            # Retreives the elements
-            purgableElementIds = failureMessages[0].GetFailingElements()
+    # Executes the purge
+    failureMessages = performanceAdviser.ExecuteRules(doc, ruleIds)
+    if failureMessages.Count > 0:
+        # Retreives the elements
+        purgableElementIds = failureMessages[0].GetFailingElements()
     # Deletes the elements
+    undeletedElementIds = _DeleteElementIds(doc, list(purgableElementIds))
+    LOGGER.debug("len(undeletedElementIds) = {}".format(len(undeletedElementIds)))
+
+
+def _DeleteElementIds(doc, elementIds):
+    """Delete elements in as few API calls as possible. When a batch fails to
+    delete it is split in half and each half is retried, so only the elements
+    that cannot be deleted end up being tried one at a time.
+
+    Args:
+        doc (DB.Document): Document hosting the elements
+        elementIds (list[DB.ElementId]): Ids of the elements to delete
+
+    Returns:
+        list[DB.ElementId]: Ids of the elements that could not be deleted
+    """
+    if not elementIds:
+        return []
     try:
-        doc.Delete(purgableElementIds)
-    except:
-        for e in purgableElementIds:
-            try:
-                doc.Delete(e)
-            except:
-                pass
+        doc.Delete(List[DB.ElementId](elementIds))
+        return []
+    except Exception:
+        if len(elementIds) == 1:
+            return elementIds
+    middle = len(elementIds) // 2
+    return _DeleteElementIds(doc, elementIds[:middle]) + _DeleteElementIds(
+        doc, elementIds[middle:]
+    )
 
 
 def GetElementMaterialIds(element):
-    LOGGER.debug("GetElementMaterialIds: element={}".format(OUTPUT.linkify(element.Id)))
+    if LOGGER.isEnabledFor(logging.DEBUG):
+        LOGGER.debug(
+            "GetElementMaterialIds: element={}".format(OUTPUT.linkify(element.Id))
+        )
+    # Some system elements and in-place families throw rather than return ids
     try:
-        elementMaterials = element.GetMaterialIds(False)
-        paintMaterials = element.GetMaterialIds(True)
-        for materialId in paintMaterials:
-            elementMaterials.append(materialId)
-        return elementMaterials
+        elementMaterials = list(element.GetMaterialIds(False))
+        elementMaterials.extend(element.GetMaterialIds(True))
     except Exception as e:
         LOGGER.debug(e)
         return []
+    return elementMaterials
 
 
 def GetMaterialDictionary(doc):
     doc = doc or HOST_APP.doc
-    materials = DB.FilteredElementCollector(doc).OfClass(DB.Material).ToElements()
+    materials = DB.FilteredElementCollector(doc).OfClass(DB.Material)
     return {material.Name: material.Id for material in materials}
 
 
@@ -304,53 +505,60 @@ def GetAllProjectMaterialIds(inUseOnly=None, doc=None):
     inUseOnly = inUseOnly if inUseOnly is not None else True
     if not inUseOnly:
         return DB.FilteredElementCollector(doc).OfClass(DB.Material).ToElementIds()
+    # Settings.Categories only lists top level categories, so exclude the
+    # annotation categories rather than include the model ones. Elements in a
+    # subcategory, like stair runs or railing top rails, are then kept.
+    annotationCategoryIds = List[DB.ElementId](
+        category.Id
+        for category in doc.Settings.Categories
+        if category.CategoryType == DB.CategoryType.Annotation
+    )
     elements = (
-        DB.FilteredElementCollector(doc).WhereElementIsNotElementType().ToElements()
+        DB.FilteredElementCollector(doc)
+        .WhereElementIsNotElementType()
+        .WherePasses(DB.ElementMulticategoryFilter(annotationCategoryIds, True))
     )
     projectMaterialIds = set()
     for element in elements:
-        for materialElementId in GetElementMaterialIds(element):
-            projectMaterialIds.add(materialElementId)
+        projectMaterialIds.update(GetElementMaterialIds(element))
     return list(projectMaterialIds)
 
 
 def GetUnusedMaterials(doc=None, nameFilter=None):
     doc = doc or HOST_APP.doc
     allMaterialIds = GetAllProjectMaterialIds(inUseOnly=False, doc=doc)
-    usedMaterialIds = GetAllProjectMaterialIds(inUseOnly=True, doc=doc)
-    usedMaterials = [
+    usedMaterialIds = set(
+        materialId.IntegerValue
+        for materialId in GetAllProjectMaterialIds(inUseOnly=True, doc=doc)
+    )
+    unusedMaterials = (
         doc.GetElement(materialId)
         for materialId in allMaterialIds
-        if materialId not in usedMaterialIds
-    ]
+        if materialId.IntegerValue not in usedMaterialIds
+    )
     if nameFilter:
         nameFilterRegex = re.compile("|".join(nameFilter))
         return [
-            usedMaterial
-            for usedMaterial in usedMaterials
-            if not nameFilterRegex.match(usedMaterial.Name)
+            unusedMaterial
+            for unusedMaterial in unusedMaterials
+            if not nameFilterRegex.match(unusedMaterial.Name)
         ]
-    else:
-        return usedMaterials
+    return list(unusedMaterials)
 
 
 def GetUnusedAssets(doc=None):
-    postPurgeMaterials = (
-        DB.FilteredElementCollector(doc).OfClass(DB.Material).ToElements()
-    )
-
-    currentAssetIds = (
-        DB.FilteredElementCollector(doc)
-        .OfClass(DB.AppearanceAssetElement)
-        .ToElementIds()
+    doc = doc or HOST_APP.doc
+    usedAssetIds = set(
+        material.AppearanceAssetId.IntegerValue
+        for material in DB.FilteredElementCollector(doc).OfClass(DB.Material)
+        if material.AppearanceAssetId is not None
     )
-
-    usedAssetIds = [material.AppearanceAssetId for material in postPurgeMaterials]
     return [
-        doc.GetElement(elementId)
-        for elementId in currentAssetIds
-        if elementId not in usedAssetIds
-        if elementId is not None
+        asset
+        for asset in DB.FilteredElementCollector(doc).OfClass(
+            DB.AppearanceAssetElement
+        )
+        if asset.Id.IntegerValue not in usedAssetIds
     ]
 
 
@@ -385,8 +593,7 @@ def GetModelFilePath(doc, promptIfBlank=True):
         revitModelPath = doc.PathName
     if not revitModelPath and promptIfBlank:
         forms.alert("Please save the model and try again.", exitscript=True)
-    uncReg = re.compile(re.escape("\\\\wha-server02\\projects"), re.IGNORECASE)
-    return uncReg.sub("x:", revitModelPath)
+    return _UNC_REGEX.sub("x:", revitModelPath)
 
 
 def GetModelDirectory(doc):
@@ -396,11 +603,14 @@ def GetModelDirectory(doc):
 def GetPhase(phaseName, doc=None):
     if doc is None:
         doc = HOST_APP.doc
-    phases = doc.Phases
-    for phase in phases:
-        if phase.Name == phaseName:
-            return phase
-    return None
+    cacheKey = doc.GetHashCode()
+    phase = _DOCUMENT_PHASES.get(cacheKey, {}).get(phaseName)
+    # Phases can be added, renamed or deleted, so check the cached phase
+    # before trusting it
+    if phase is None or not phase.IsValidObject or phase.Name != phaseName:
+        _DOCUMENT_PHASES[cacheKey] = {phase.Name: phase for phase in doc.Phases}
+        phase = _DOCUMENT_PHASES[cacheKey].get(phaseName)
+    return phase
 
 
 def OpenDetached(filePath, audit=False, preserveWorksets=True, visible=False):
@@ -424,25 +634,36 @@ def OpenLocal(filePath, localDir, extension="", hostApp=None):
     LOGGER.debug('Flamingo "OpenLocal" called')
     localDir = path.expandvars(localDir)
     centralFileName = path.basename(filePath)
-    centralName = re.sub(r"\.rvt$", "", centralFileName)
+    centralName = _RVT_EXTENSION_REGEX.sub("", centralFileName)
     localFileName = "{}_{}{}.rvt".format(centralName, HOST_APP.username, extension)
     localPath = path.join(localDir, localFileName)
     LOGGER.info("filePath={}".format(filePath))
     LOGGER.info("localPath={}".format(localPath))
-    shutil.copyfile(filePath, localPath)
+    # Opening the local file for writing truncates it, so never copy the central
+    # model onto itself
+    centralPath = path.normcase(path.abspath(filePath))
+    if centralPath == path.normcase(path.abspath(localPath)):
+        raise shutil.Error(
+            "`{}` and `{}` are the same file".format(filePath, localPath)
+        )
+    with open(filePath, "rb") as src, open(localPath, "wb") as dst:
+        shutil.copyfileobj(src, dst, _LOCAL_COPY_BUFFER_SIZE)
     return hostApp.uiapp.OpenAndActivateDocument(localPath)
 
 
 def GetDefaultPathForUserFiles(app=None):
-    app = HOST_APP.doc.Application
+    app = app or HOST_APP.app
     currentUsersDataFolderPath = app.CurrentUsersDataFolderPath
     revitIniPath = "{}/Revit.ini".format(currentUsersDataFolderPath)
-    if path.exists(revitIniPath):
+    if not path.exists(revitIniPath):
+        return None
+    cacheKey = (revitIniPath, path.getmtime(revitIniPath))
+    if cacheKey not in _REVIT_INI_PROJECT_PATHS:
         cp = configparser.ConfigParser()
         with codecs.open(revitIniPath, mode="r", encoding="UTF-16") as f:
             cp.readfp(f)
-        return cp.get("Directories", "projectpath")
-    return None
+        _REVIT_INI_PROJECT_PATHS[cacheKey] = cp.get("Directories", "projectpath")
+    return _REVIT_INI_PROJECT_PATHS[cacheKey]
 
 
 def SaveAsCentral(doc, centralPath):
@@ -459,6 +680,29 @@ def SaveAsCentral(doc, centralPath):
     return doc
 
 
+def _GetSuffix(suffixList, index):
+    """Get the suffix at an index, continuing past the end of the list the way
+    spreadsheet columns do (Z, AA, AB...)
+
+    Args:
+        suffixList (list[str]): Suffixes to pick from
+        index (int): Zero based position of the suffix
+
+    Returns:
+        str: Suffix for the index
+    """
+    suffixCount = len(suffixList)
+    if not suffixCount:
+        raise ValueError("suffixList must contain at least one suffix")
+    suffix = suffixList[index % suffixCount]
+    index //= suffixCount
+    while index:
+        index -= 1
+        suffix = suffixList[index % suffixCount] + suffix
+        index //= suffixCount
+    return suffix
+
+
 def DoorRenameByRoomNumber(
     doors,
     phase,
@@ -497,136 +741,136 @@ def DoorRenameByRoomNumber(
         DB.FilteredElementCollector(doc)
         .OfCategory(DB.BuiltInCategory.OST_Doors)
         .WhereElementIsNotElementType()
-        .ToElements()
     )
-    selectedDoorIds = [door.Id for door in doors]
+    selectedDoorIds = set(door.Id.IntegerValue for door in doors)
 
-    # Make a dictionary of rooms with door properties
+    # Read the rooms on each side of every door once for the phase and make
+    # a dictionary of rooms with door properties
+    doorsById = {}
+    roomIdsByDoor = {}
     doorsByRoom = {}
+    # Door and room ids are kept as integers, which hash without going
+    # through the API
     for door in allDoors:
         if not door:
             continue
-        roomsToAdd = []
+        doorId = door.Id.IntegerValue
+        doorsById[doorId] = door
         try:
-            toRoom = (door.ToRoom)[phase]
+            toRoom = door.get_ToRoom(phase)
         except Exception as e:
             continue
-        if toRoom:
-            if toRoom.Id in doorsByRoom:
-                doorsByRoom[toRoom.Id]["doors"] = doorsByRoom[toRoom.Id]["doors"] + [
-                    door.Id
-                ]
-            else:
-                roomsToAdd.append(toRoom)
-        fromRoom = (door.FromRoom)[phase]
-        if fromRoom:
-            if fromRoom.Id in doorsByRoom:
-                doorsByRoom[fromRoom.Id]["doors"] = doorsByRoom[fromRoom.Id][
-                    "doors"
-                ] + [door.Id]
-            else:
-                roomsToAdd.append(fromRoom)
-        for roomToAdd in roomsToAdd:
-            roomCenter = roomToAdd.Location.Point
-            doorsByRoom[roomToAdd.Id] = {
-                "doors": [door.Id],
-                "roomNumber": roomToAdd.Number,
-                "roomArea": roomToAdd.Area,
-                "roomLocation": roomCenter,
-            }
+        fromRoom = door.get_FromRoom(phase)
+        roomIds = []
+        for room in (toRoom, fromRoom):
+            if not room:
+                continue
+            roomId = room.Id.IntegerValue
+            # A door with the same room on both sides only belongs to it once
+            if roomId in roomIds:
+                continue
+            roomIds.append(roomId)
+            values = doorsByRoom.get(roomId)
+            if values is None:
+                values = doorsByRoom[roomId] = {
+                    "doors": [],
+                    "roomNumber": room.Number,
+                    "roomArea": room.Area,
+                }
+            values["doors"].append(doorId)
+        roomIdsByDoor[doorId] = roomIds
 
     # Make a dictionary of door connection counts. This will be used to
     # prioritize doors with more connections when assigning a letter value
-    doorsByRoomDoors = [value["doors"] for value in doorsByRoom.values()]
-    doorConnectors = {}
-    for door in allDoors:
-        for i in doorsByRoomDoors:
-            if door.Id in i:
-                if door.Id in doorConnectors:
-                    doorConnectors[door.Id] += len(i)
-                else:
-                    doorConnectors[door.Id] = len(i)
-
-    maxLength = max([len(values["doors"]) for values in doorsByRoom.values()])
-    for key, values in doorsByRoom.items():
-        doorsByRoom[key]["doorCount"] = len(values["doors"])
+    doorConnectors = Counter()
+    for values in doorsByRoom.values():
+        roomDoorCount = len(values["doors"])
+        for doorId in values["doors"]:
+            doorConnectors[doorId] += roomDoorCount
+
+    # Rooms bucketed by their count of unnumbered doors
+    countBuckets = {}
+    for roomId, values in doorsByRoom.items():
+        values["doorCount"] = len(values["doors"])
+        countBuckets.setdefault(values["doorCount"], set()).add(roomId)
+    maxLength = max(countBuckets)
+    # No room needs more suffixes than its starting door count
+    suffixes = tuple(_GetSuffix(suffixList, j) for j in range(maxLength))
+
+    # Areas never change, so rank the rooms by area once up front
+    areaRanks = {
+        roomId: rank
+        for rank, roomId in enumerate(
+            sorted(doorsByRoom, key=lambda x: doorsByRoom[x]["roomArea"])
+        )
+    }
 
     # Number doors
     doorCount = len(doors)
     numberedDoors = set()
-    with revit.Transaction("Renumber Doors"):
-        i = 1
-        n = 0
-        nMax = doorCount * 2
-
-        # iterate through counts of doors connected to each room
-        while i <= maxLength:
-            # avoid a loop by stoping at double the count of doors
-            if n > nMax:
-                # if n > 4:
-                break
-            noRooms = True
-            roomsThisRound = [
-                roomId
-                for roomId, value in doorsByRoom.items()
-                if value["doorCount"] == i
+    # Marks are worked out first and written in one transaction afterwards
+    markParameter = DB.BuiltInParameter.ALL_MODEL_MARK
+    doorMarks = []
+    i = 1
+    n = 0
+    nMax = doorCount * 2
+
+    # iterate through counts of doors connected to each room
+    while i <= maxLength:
+        # avoid a loop by stoping at double the count of doors
+        if n > nMax:
+            # if n > 4:
+            break
+        numberedThisRound = []
+        # Rooms whose door count matches the current level
+        roomsThisRound = sorted(countBuckets.get(i, ()), key=areaRanks.get)
+        noRooms = not roomsThisRound
+        for roomId in roomsThisRound:
+            values = doorsByRoom[roomId]
+            doorIds = values["doors"]
+            doorsToNumber = [
+                doorId for doorId in doorIds if doorId not in numberedDoors
             ]
-            roomsThisRound = sorted(
-                roomsThisRound, key=lambda x: doorsByRoom[x]["roomArea"]
+            # Go through all the doors connected to the room
+            # and give them a number
+            sortedDoorsToNumber = sorted(
+                doorsToNumber, key=lambda x: doorConnectors[x], reverse=True
             )
-            # Go through each room and look for door counts that match
-            # current level
-            # for key, values in doorsByRoom.items():
-            for roomId in roomsThisRound:
+            for j, doorId in enumerate(sortedDoorsToNumber):
+                numberedDoors.add(doorId)
+                numberedThisRound.append(doorId)
+                if doorId not in selectedDoorIds:
+                    continue
+                if len(doorsToNumber) > 1:
+                    mark = values["roomNumber"] + suffixes[j]
+                else:
+                    mark = values["roomNumber"]
+                doorMarks.append((doorsById[doorId].get_Parameter(markParameter), mark))
+        # Drop the doors numbered this round from the rooms they connect
+        # and move those rooms to the bucket for their new count
+        for doorId in numberedThisRound:
+            for roomId in roomIdsByDoor[doorId]:
                 values = doorsByRoom[roomId]
-                if values["doorCount"] == i:
-                    noRooms = False
-                    doorIds = values["doors"]
-                    doorsToNumber = [
-                        doorId for doorId in doorIds if doorId not in numberedDoors
-                    ]
-                    # Go through all the doors connected to the room
-                    # and give them a number
-                    sortedDoorsToNumber = sorted(
-                        doorsToNumber, key=lambda x: doorConnectors[x], reverse=True
-                    )
-                    for j, doorId in enumerate(sortedDoorsToNumber):
-                        numberedDoors.add(doorId)
-                        door = doc.GetElement(doorId)
-                        if len(doorsToNumber) > 1:
-                            boundingBox = door.get_BoundingBox(None)
-                            roomCenter = values["roomLocation"]
-                            doorCenter = GetMidPoint(boundingBox.Min, boundingBox.Max)
-                            doorVector = doorCenter.Subtract(roomCenter)
-                            angle = atan2(doorVector.Y, doorVector.X)
-                            angleReversed = angle * -1.0
-                            pi2 = pi * 2.0
-                            angleNormalized = ((angleReversed + pi2 + 2) % pi2) / pi2
-                            mark = "{}{}".format(
-                                values["roomNumber"], ascii_uppercase[j]
-                            )
-                            # print("{}: {} {} rad | {} ratio".format(mark, doorVector, angle, angleNormalized))
-                        else:
-                            mark = values["roomNumber"]
-                        if door.Id in selectedDoorIds:
-                            markParameter = door.get_Parameter(
-                                DB.BuiltInParameter.ALL_MODEL_MARK
-                            )
-                            markParameter.Set(mark)
-            for roomId, values in doorsByRoom.items():
-                unNumberedDoors = filter(
-                    None,
-                    [
-                        doorId
-                        for doorId in values["doors"]
-                        if doorId not in numberedDoors
-                    ],
-                )
-                doorsByRoom[roomId]["doors"] = unNumberedDoors
-                doorsByRoom[roomId]["doorCount"] = len(unNumberedDoors)
-            if noRooms:
-                i += 1
-            n += 1
+                values["doors"].remove(doorId)
+                countBuckets[values["doorCount"]].discard(roomId)
+                values["doorCount"] -= 1
+                countBuckets.setdefault(values["doorCount"], set()).add(roomId)
+        if noRooms:
+            i += 1
+        n += 1
+
+    with revit.Transaction("Renumber Doors"):
+        # Write in sub transactions so a failed batch does not undo the rest
+        for start in range(0, len(doorMarks), _DOOR_MARK_BATCH_SIZE):
+            subTransaction = DB.SubTransaction(doc)
+            subTransaction.Start()
+            try:
+                for parameter, mark in doorMarks[start : start + _DOOR_MARK_BATCH_SIZE]:
+                    parameter.Set(mark)
+                subTransaction.Commit()
+            except Exception as e:
+                subTransaction.RollBack()
+                LOGGER.warn("Unable to renumber doors: {}".format(e))
     return doors
 
 
@@ -640,11 +884,25 @@ def FilterByCategory(elements, builtInCategory):
     Returns:
         list[DB.Elements]: List of revit elements that matched the filter
     """
-    return [
-        element
-        for element in elements
-        if element.Category.Id.IntegerValue == int(builtInCategory)
-    ]
+    categoryFilter = DB.ElementCategoryFilter(builtInCategory)
+    return [element for element in elements if categoryFilter.PassesFilter(element)]
+
+
+def FilterByCategories(elements, builtInCategories):
+    """Filters a list of Revit elements by several BuiltInCategories in a single
+    pass
+
+    Args:
+        elements (list[DB.Elements]): List of revit elements to filter
+        builtInCategories (list[DB.BuiltInCategory]): Revit built in category
+            enums to filter by
+    Returns:
+        list[DB.Elements]: List of revit elements that matched any category
+    """
+    categoryFilter = DB.ElementMulticategoryFilter(
+        List[DB.BuiltInCategory](builtInCategories)
+    )
+    return [element for element in elements if categoryFilter.PassesFilter(element)]
 
 
 def HideUnplacedViewTags(view=None, doc=None):
@@ -668,19 +926,20 @@ def HideUnplacedViewTags(view=None, doc=None):
     if view is None:
         view = doc.ActiveView
 
-    viewers = (
-        DB.FilteredElementCollector(doc, view.Id)
-        .OfCategory(DB.BuiltInCategory.OST_Viewers)
-        .WhereElementIsNotElementType()
-        .ToElements()
-    )
-    viewerIds = [viewer.Id.IntegerValue for viewer in viewers]
-    elevs = (
+    viewElements = (
         DB.FilteredElementCollector(doc, view.Id)
-        .OfCategory(DB.BuiltInCategory.OST_Elev)
         .WhereElementIsNotElementType()
-        .ToElements()
+        .WherePasses(_VIEW_TAG_CATEGORY_FILTER)
     )
+    viewersCategoryId = int(DB.BuiltInCategory.OST_Viewers)
+    viewers = []
+    elevs = []
+    for viewElement in viewElements:
+        if viewElement.Category.Id.IntegerValue == viewersCategoryId:
+            viewers.append(viewElement)
+        else:
+            elevs.append(viewElement)
+    viewerIds = set(viewer.Id.IntegerValue for viewer in viewers)
 
     # Go through all filtered elements to figure out if they have a sheet number
     # If they don't hide them by element
@@ -705,10 +964,11 @@ def HideUnplacedViewTags(view=None, doc=None):
             hideList.Add(element.Id)
             continue
         dependentElementIds = element.GetDependentElements(elementFilter)
-        shownViews = len(dependentElementIds)
-        for dependentElementId in dependentElementIds:
-            if dependentElementId.IntegerValue not in viewerIds:
-                shownViews = shownViews - 1
+        shownViews = sum(
+            1
+            for dependentElementId in dependentElementIds
+            if dependentElementId.IntegerValue in viewerIds
+        )
         if shownViews < 1:
             hideList.Add(element.Id)
     if len(hideList) > 0:
@@ -724,20 +984,19 @@ def UnhideViewTags(view=None, doc=None):
         doc = HOST_APP.doc
     if view is None:
         view = doc.ActiveView
-    categoryList = (DB.BuiltInCategory.OST_Viewers, DB.BuiltInCategory.OST_Elev)
-    categoriesTyped = List[DB.BuiltInCategory](categoryList)
-    categoryFilter = DB.ElementMulticategoryFilter(categoriesTyped)
     viewElements = (
         DB.FilteredElementCollector(doc)
         .WhereElementIsNotElementType()
-        .WherePasses(categoryFilter)
-        .ToElements()
+        .WherePasses(_VIEW_TAG_CATEGORY_FILTER)
     )
 
     hiddenElements = List[DB.ElementId]()
-    [hiddenElements.Add(e.Id) for e in viewElements if e.IsHidden(view)]
-    with revit.Transaction("Unhide view tags"):
-        view.UnhideElements(hiddenElements)
+    for viewElement in viewElements:
+        if viewElement.IsHidden(view):
+            hiddenElements.Add(viewElement.Id)
+    if hiddenElements.Count > 0:
+        with revit.Transaction("Unhide view tags"):
+            view.UnhideElements(hiddenElements)
 
 
 def GetViewPhase(view, doc=None):
@@ -758,14 +1017,83 @@ def GetViewPhaseFilter(view, doc=None):
     return doc.GetElement(viewPhaseFilterId)
 
 
-def _TestRoomIntersect(room, solid):
+def _GetRoomGeometry(room, roomGeometry):
+    roomId = room.Id.IntegerValue
+    if roomId not in roomGeometry:
+        boundingBox = room.get_BoundingBox(None)
+        roomGeometry[roomId] = (
+            GetSolids(room)[0],
+            _GetExtents(boundingBox.Min, boundingBox.Max),
+        )
+    return roomGeometry[roomId]
+
+
+def _GetExtents(minPoint, maxPoint):
+    return (minPoint.X, minPoint.Y, minPoint.Z, maxPoint.X, maxPoint.Y, maxPoint.Z)
+
+
+def _GetSolidExtents(solid):
+    boundingBox = solid.GetBoundingBox()
+    return _GetTransformedExtents(
+        boundingBox.Transform, boundingBox.Min, boundingBox.Max
+    )
+
+
+def _GetTransformedExtents(transform, minPoint, maxPoint):
+    # Rotations can swap or mix the axes, so all eight corners are transformed
+    corners = [
+        transform.OfPoint(DB.XYZ(x, y, z))
+        for x in (minPoint.X, maxPoint.X)
+        for y in (minPoint.Y, maxPoint.Y)
+        for z in (minPoint.Z, maxPoint.Z)
+    ]
+    return (
+        min(corner.X for corner in corners),
+        min(corner.Y for corner in corners),
+        min(corner.Z for corner in corners),
+        max(corner.X for corner in corners),
+        max(corner.Y for corner in corners),
+        max(corner.Z for corner in corners),
+    )
+
+
+def _ExtentsOverlap(extents1, extents2):
+    return (
+        extents1[0] <= extents2[3]
+        and extents1[3] >= extents2[0]
+        and extents1[1] <= extents2[4]
+        and extents1[4] >= extents2[1]
+        and extents1[2] <= extents2[5]
+        and extents1[5] >= extents2[2]
+    )
+
+
+def _ExtentsOverlapVolume(extents1, extents2):
+    volume = 1.0
+    for minIndex in range(3):
+        maxIndex = minIndex + 3
+        overlap = min(extents1[maxIndex], extents2[maxIndex]) - max(
+            extents1[minIndex], extents2[minIndex]
+        )
+        if overlap <= 0:
+            return 0.0
+        volume *= overlap
+    return volume
+
+
+def _TestRoomIntersect(room, solid, roomGeometry=None, solidExtents=None):
     from Autodesk.Revit.Exceptions import InvalidOperationException
 
     LOGGER.debug("room.Number = {}".format(room.Number))
-    roomSolids = GetSolids(room)
+    if roomGeometry is None:
+        roomGeometry = {}
+    roomSolid, roomExtents = _GetRoomGeometry(room, roomGeometry)
+    # Skip the boolean intersection when the bounding boxes do not touch
+    if solidExtents is not None and not _ExtentsOverlap(roomExtents, solidExtents):
+        return None, None
     try:
         interSolid = DB.BooleanOperationsUtils.ExecuteBooleanOperation(
-            roomSolids[0], solid, DB.BooleanOperationsType.Intersect
+            roomSolid, solid, DB.BooleanOperationsType.Intersect
         )
         LOGGER.debug("interSolid.Volume = {}".format(interSolid.Volume))
         if hasattr(interSolid, "Volume") and abs(interSolid.Volume > 0.000001):
@@ -781,21 +1109,36 @@ def _ProjectToLevel(elementOutline, element):
     location = element.Location
     if type(location) == DB.LocationCurve:
         curve = location.Curve
-        elementPoint = curve.GetEndPoint(-1)
+        elementPoint = curve.GetEndPoint(0)
     elif hasattr(location, "Point"):
         elementPoint = location.Point
     else:
         elementPoint = None
     LOGGER.debug("elementPoint = {}".format(elementPoint))
-    if elementPoint:
-        if hasattr(element, "LevelId"):
-            elementLevel = doc.GetElement(element.LevelId)
-            if elementLevel:
-                z = elementLevel.Elevation
-        else:
-            z = elementPoint.Z
-            elementOutline.AddPoint(DB.XYZ(elementPoint.X, elementPoint.Y, z))
-    return elementOutline
+    if not elementPoint:
+        return elementOutline
+    z = elementPoint.Z
+    if hasattr(element, "LevelId"):
+        elementLevel = doc.GetElement(element.LevelId)
+        if elementLevel:
+            # Element coordinates are in project space, which Elevation is not
+            # when the elevation base is not the project base point
+            z = elementLevel.ProjectElevation
+    x = elementPoint.X
+    y = elementPoint.Y
+    minPoint = elementOutline.MinimumPoint
+    maxPoint = elementOutline.MaximumPoint
+    # Only build a new outline when the point falls outside the current one
+    if (
+        minPoint.X <= x <= maxPoint.X
+        and minPoint.Y <= y <= maxPoint.Y
+        and minPoint.Z <= z <= maxPoint.Z
+    ):
+        return elementOutline
+    return DB.Outline(
+        DB.XYZ(min(minPoint.X, x), min(minPoint.Y, y), min(minPoint.Z, z)),
+        DB.XYZ(max(maxPoint.X, x), max(maxPoint.Y, y), max(maxPoint.Z, z)),
+    )
 
 
 def GetElementRoomsFromLink(
@@ -805,29 +1148,17 @@ def GetElementRoomsFromLink(
     roomsFromLink=None,
     offset=1.0,
     projectToLevel=True,
+    roomGeometry=None,
 ):
-    LOGGER.info(
-        "GetElementRoomsFromLink: element={}".format(OUTPUT.linkify(element.Id))
-    )
-    elementBoundingBox = element.get_BoundingBox(None)
-    if not elementBoundingBox.Enabled:
-        LOGGER.debug("Bounding Box Not Enabled")
+    if LOGGER.isEnabledFor(logging.INFO):
+        LOGGER.info(
+            "GetElementRoomsFromLink: element={}".format(OUTPUT.linkify(element.Id))
+        )
+    elementOutline = _GetElementOutline(element, offset, projectToLevel)
+    if elementOutline is None:
         return
 
-    elementOutline = DB.Outline(
-        elementBoundingBox.Min.Add(DB.XYZ(-1.0 * offset, -1.0 * offset, -1.0 * offset)),
-        elementBoundingBox.Max.Add(DB.XYZ(offset, offset, offset)),
-    )
-
-    if projectToLevel and element.Location is not None:
-        elementOutline = _ProjectToLevel(elementOutline, element)
-
-    # Transform the outline to the link
-    inverseTransform = transform.Inverse
-    transformedMinPoint = inverseTransform.OfPoint(elementOutline.MinimumPoint)
-    transformedMaxPoint = inverseTransform.OfPoint(elementOutline.MaximumPoint)
-
-    transformedOutline = DB.Outline(transformedMinPoint, transformedMaxPoint)
+    transformedOutline = _TransformOutlineToLink(elementOutline, transform)
     boundingBoxIntersectsFilter = DB.BoundingBoxIntersectsFilter(transformedOutline)
 
     if roomsFromLink:
@@ -835,7 +1166,7 @@ def GetElementRoomsFromLink(
             DB.FilteredElementCollector(linkDoc)
             .WherePasses(
                 DB.ElementIdSetFilter(
-                    List[DB.ElementId](room.Id for room in roomsFromLink)
+                    _ElementIdList([room.Id for room in roomsFromLink])
                 )
             )
             .WherePasses(boundingBoxIntersectsFilter)
@@ -850,12 +1181,20 @@ def GetElementRoomsFromLink(
         )
     LOGGER.debug("Number of intersecting rooms: {}".format(len(rooms)))
     elementSolids = GetSolids(element)
-    matchedRooms = _GetMatchingRooms(element, elementSolids, elementOutline, rooms)
+    matchedRooms = _GetMatchingRooms(
+        element, elementSolids, elementOutline, rooms, roomGeometry
+    )
     return matchedRooms
 
 
 def GetElementRooms(
-    element, phase, rooms=None, offset=1.0, projectToLevel=True, doc=None
+    element,
+    phase,
+    rooms=None,
+    offset=1.0,
+    projectToLevel=True,
+    doc=None,
+    roomGeometry=None,
 ):
     """Find the room in a Revit model that a element is placed in or near.
     The function should find the room if it is located above or within a
@@ -875,65 +1214,49 @@ def GetElementRooms(
             room like a diffuser.
         doc (DB.Document, optional): The document in which the element is
             located. Defaults to None.
+        roomGeometry (dict, optional): Room solids and extents to share between
+            calls that match elements against the same, unchanged rooms. Pass
+            a new dict for each run. Defaults to None, which reads the room
+            geometry for this call only.
 
     Returns:
         DB.Room: Room in the Revit model to which the element is matched.
     """
     from Autodesk.Revit.Exceptions import InvalidOperationException
 
-    LOGGER.debug(
-        "GetElementRoom: element={}, phase={}, len(rooms)={}, offset={}, "
-        "projectToLevel={}".format(
-            OUTPUT.linkify(element.Id), phase.Id, len(rooms), offset, projectToLevel
+    if LOGGER.isEnabledFor(logging.DEBUG):
+        LOGGER.debug(
+            "GetElementRoom: element={}, phase={}, len(rooms)={}, offset={}, "
+            "projectToLevel={}".format(
+                OUTPUT.linkify(element.Id),
+                phase.Id,
+                len(rooms) if rooms is not None else None,
+                offset,
+                projectToLevel,
+            )
         )
-    )
     if doc is None:
         doc = element.Document
 
-    # Check if element self reports room
-    if hasattr(element, "ToRoom"):
-        toRoom = [(element.ToRoom)[phase]]
-        fromRoom = (element.FromRoom)[phase]
-        if fromRoom:
-            toRoom.append(fromRoom)
-        if all(toRoom):
-            LOGGER.debug("Element self reports room with ToRoom property")
-            return toRoom
-    if hasattr(element, "Room"):
-        elementRoom = (element.Room)[phase]
-        if elementRoom is not None:
-            LOGGER.debug("Element self reports room with room property")
-            return [elementRoom]
+    selfReportedRooms = _GetSelfReportedRooms(element, phase)
+    if selfReportedRooms:
+        return selfReportedRooms
 
     LOGGER.debug("Element does not self report room, searching for intersecting rooms")
 
-    # Get the elements bounding box
-    elementBoundingBox = element.get_BoundingBox(None)
-    if not elementBoundingBox.Enabled:
-        LOGGER.debug("Bounding Box Not Enabled")
+    elementOutline = _GetElementOutline(element, offset, projectToLevel)
+    if elementOutline is None:
         return
 
-    elementOutline = DB.Outline(
-        elementBoundingBox.Min.Add(DB.XYZ(-1.0 * offset, -1.0 * offset, -1.0 * offset)),
-        elementBoundingBox.Max.Add(DB.XYZ(offset, offset, offset)),
-    )
-
-    if projectToLevel and element.Location is not None:
-        LOGGER.debug("Projecting to level")
-        elementOutline = _ProjectToLevel(elementOutline, element)
-
     boundingBoxIntersectsFilter = DB.BoundingBoxIntersectsFilter(elementOutline)
 
     LOGGER.debug("Searching for intersecting rooms")
     if rooms:
-        # msg = ["roomId={}/n".format(room.Id) for room in rooms]
-        msg = ["room type={}/n".format(type(room)) for room in rooms]
-        print(msg)
         rooms = (
             DB.FilteredElementCollector(doc)
             .WherePasses(
                 DB.ElementIdSetFilter(
-                    List[DB.ElementId](room.Id for room in rooms if hasattr(room, "Id"))
+                    _ElementIdList([room.Id for room in rooms if hasattr(room, "Id")])
                 )
             )
             .WherePasses(boundingBoxIntersectsFilter)
@@ -948,28 +1271,269 @@ def GetElementRooms(
         )
     LOGGER.debug("Number of intersecting rooms: {}".format(len(rooms)))
     elementSolids = GetSolids(element)
-    matchedRooms = _GetMatchingRooms(element, elementSolids, elementOutline, rooms)
+    matchedRooms = _GetMatchingRooms(
+        element, elementSolids, elementOutline, rooms, roomGeometry
+    )
     return matchedRooms
 
 
-def _GetMatchingRooms(element, elementSolids, elementOutline, rooms):
-    LOGGER.debug(
-        "_GetMatchingRooms(element={}, elementSolids={}, elementOutline={}, "
-        "len(rooms)={})".format(element.Id, elementSolids, elementOutline, len(rooms))
+def _ElementIdList(elementIds):
+    # Copy through an array so the List is sized once instead of growing per id
+    return List[DB.ElementId](Array[DB.ElementId](elementIds))
+
+
+def _TransformOutlineToLink(elementOutline, transform):
+    # Transform the outline to the link
+    minX, minY, minZ, maxX, maxY, maxZ = _GetTransformedExtents(
+        transform.Inverse, elementOutline.MinimumPoint, elementOutline.MaximumPoint
+    )
+    return DB.Outline(DB.XYZ(minX, minY, minZ), DB.XYZ(maxX, maxY, maxZ))
+
+
+def GetElementRoomsBatch(
+    elements,
+    phase,
+    rooms=None,
+    offset=1.0,
+    projectToLevel=True,
+    doc=None,
+    transform=None,
+):
+    """Find the rooms for many elements at once. The bounding boxes of the
+    rooms are read once and indexed on a plan grid, so each element only
+    tests the rooms that share a grid cell with it instead of querying the
+    model for every element. Matching otherwise works like GetElementRooms.
+
+    Args:
+        elements (list(DB.FamilyInstance)): Elements who's rooms are to be
+            located
+        phase (DB.Phase): The phase of the rooms that are to be matched to the
+            elements.
+        rooms (list(DB.SpatialElement), optional): List of rooms to check.
+            Defaults to all the rooms in the document.
+        offset (float, optional): Offset to provide the the room geometry.
+            Defaults to 1.0.
+        projectToLevel (bool, optional): If set to true, the boundary of each
+            element will be expanded down to the level the object is
+            associated. Defaults to True.
+        doc (DB.Document, optional): The document in which the rooms are
+            located. Defaults to the document of the elements, and is
+            required when a transform is provided.
+        transform (DB.Transform, optional): Total transform of the link
+            instance when the rooms come from a linked model. Elements are
+            then matched like GetElementRoomsFromLink and do not self report
+            rooms. Defaults to None.
+
+    Returns:
+        list(list(DB.Room)): Rooms matched to each element, in the same order
+            as the elements. None is returned for elements without an enabled
+            bounding box and for elements that failed to match, which are
+            logged.
+    """
+    elements = list(elements)
+    if not elements:
+        return []
+    if doc is None:
+        if transform is not None:
+            raise ValueError("doc is required when matching rooms from a link")
+        doc = elements[0].Document
+    if rooms is None:
+        rooms = DB.FilteredElementCollector(doc).OfCategory(
+            DB.BuiltInCategory.OST_Rooms
+        )
+    roomIndex = _BuildRoomIndex(rooms)
+    # Room geometry is only shared within this batch, so changes made to rooms
+    # between calls are always picked up
+    roomGeometry = {}
+    elementRooms = []
+    for element in elements:
+        # One element that cannot be matched should not stop the whole batch
+        try:
+            rooms = _GetIndexedElementRooms(
+                element,
+                phase,
+                roomIndex,
+                roomGeometry,
+                offset,
+                projectToLevel,
+                transform,
+            )
+        except Exception as e:
+            LOGGER.warn(
+                "{}: Unable to match rooms: {}".format(OUTPUT.linkify(element.Id), e)
+            )
+            rooms = None
+        elementRooms.append(rooms)
+    return elementRooms
+
+
+def _GetIndexedElementRooms(
+    element, phase, roomIndex, roomGeometry, offset, projectToLevel, transform
+):
+    if transform is None:
+        selfReportedRooms = _GetSelfReportedRooms(element, phase)
+        if selfReportedRooms:
+            return selfReportedRooms
+    elementOutline = _GetElementOutline(element, offset, projectToLevel)
+    if elementOutline is None:
+        return None
+    if transform is None:
+        candidateRooms = _QueryRoomIndex(roomIndex, elementOutline)
+    else:
+        candidateRooms = _QueryRoomIndex(
+            roomIndex, _TransformOutlineToLink(elementOutline, transform)
+        )
+    elementSolids = GetSolids(element)
+    return _GetMatchingRooms(
+        element, elementSolids, elementOutline, candidateRooms, roomGeometry
+    )
+
+
+def _GetSelfReportedRooms(element, phase):
+    # Check if element self reports room
+    if hasattr(element, "ToRoom"):
+        toRoom = (element.ToRoom)[phase]
+        if toRoom is not None:
+            LOGGER.debug("Element self reports room with ToRoom property")
+            fromRoom = (element.FromRoom)[phase]
+            if fromRoom is not None:
+                return [toRoom, fromRoom]
+            return [toRoom]
+    if hasattr(element, "Room"):
+        elementRoom = (element.Room)[phase]
+        if elementRoom is not None:
+            LOGGER.debug("Element self reports room with room property")
+            return [elementRoom]
+    return None
+
+
+def _GetElementOutline(element, offset, projectToLevel):
+    # Get the elements bounding box
+    elementBoundingBox = element.get_BoundingBox(None)
+    if elementBoundingBox is None or not elementBoundingBox.Enabled:
+        LOGGER.debug("Bounding Box Not Enabled")
+        return None
+
+    elementOutline = DB.Outline(
+        elementBoundingBox.Min.Add(DB.XYZ(-1.0 * offset, -1.0 * offset, -1.0 * offset)),
+        elementBoundingBox.Max.Add(DB.XYZ(offset, offset, offset)),
     )
+
+    if projectToLevel and element.Location is not None:
+        LOGGER.debug("Projecting to level")
+        elementOutline = _ProjectToLevel(elementOutline, element)
+    return elementOutline
+
+
+def _GetGridCells(minPoint, maxPoint):
+    minX = int(floor(minPoint.X / _ROOM_INDEX_CELL_SIZE))
+    maxX = int(floor(maxPoint.X / _ROOM_INDEX_CELL_SIZE))
+    minY = int(floor(minPoint.Y / _ROOM_INDEX_CELL_SIZE))
+    maxY = int(floor(maxPoint.Y / _ROOM_INDEX_CELL_SIZE))
+    # Huge or bad extents, like site elements or links far from the origin,
+    # would cover millions of cells, so leave them out of the grid
+    if (maxX - minX + 1) * (maxY - minY + 1) > _ROOM_INDEX_MAX_CELLS:
+        return None
+    return [(x, y) for x in range(minX, maxX + 1) for y in range(minY, maxY + 1)]
+
+
+def _BuildRoomIndex(rooms):
+    """Index rooms by the plan grid cells their bounding boxes cover. Each
+    entry holds the room, its id and its bounding box extents so queries do
+    not need to go back to the Revit API.
+
+    Args:
+        rooms (list(DB.SpatialElement)): Rooms to index
+
+    Returns:
+        dict: Lists of (room id, extents, room) keyed by grid cell. Rooms too
+            large for the grid are listed under None and checked by every
+            query.
+    """
+    roomIndex = {None: []}
+    for room in rooms:
+        boundingBox = room.get_BoundingBox(None)
+        if boundingBox is None:
+            continue
+        minPoint = boundingBox.Min
+        maxPoint = boundingBox.Max
+        entry = (room.Id.IntegerValue, _GetExtents(minPoint, maxPoint), room)
+        cells = _GetGridCells(minPoint, maxPoint)
+        if cells is None:
+            roomIndex[None].append(entry)
+            continue
+        for cell in cells:
+            roomIndex.setdefault(cell, []).append(entry)
+    return roomIndex
+
+
+def _QueryRoomIndex(roomIndex, outline):
+    minPoint = outline.MinimumPoint
+    maxPoint = outline.MaximumPoint
+    minX, minY, minZ, maxX, maxY, maxZ = _GetExtents(minPoint, maxPoint)
+    cells = _GetGridCells(minPoint, maxPoint)
+    if cells is None:
+        # Check every indexed room rather than walking a huge number of cells
+        entryLists = roomIndex.values()
+    else:
+        entryLists = [roomIndex[None]] + [roomIndex.get(cell, ()) for cell in cells]
+    checkedRoomIds = set()
+    rooms = []
+    for entries in entryLists:
+        for roomId, extents, room in entries:
+            if roomId in checkedRoomIds:
+                continue
+            checkedRoomIds.add(roomId)
+            # Same test as _ExtentsOverlap, inlined as this runs for every
+            # candidate room of every element
+            roomMinX, roomMinY, roomMinZ, roomMaxX, roomMaxY, roomMaxZ = extents
+            if (
+                roomMinX <= maxX
+                and roomMaxX >= minX
+                and roomMinY <= maxY
+                and roomMaxY >= minY
+                and roomMinZ <= maxZ
+                and roomMaxZ >= minZ
+            ):
+                rooms.append(room)
+    return rooms
+
+
+def _GetMatchingRooms(
+    element, elementSolids, elementOutline, rooms, roomGeometry=None
+):
+    if LOGGER.isEnabledFor(logging.DEBUG):
+        LOGGER.debug(
+            "_GetMatchingRooms(element={}, elementSolids={}, elementOutline={}, "
+            "len(rooms)={})".format(
+                element.Id, elementSolids, elementOutline, len(rooms)
+            )
+        )
     LOGGER.info("Matching room with element solid method")
+    # Room solids and extents are keyed by room id and can be shared between
+    # calls
+    if roomGeometry is None:
+        roomGeometry = {}
+    # Revit often returns empty solids, which cannot intersect a room and have
+    # no usable bounding box
+    elementSolidExtents = [
+        (elementSolid, _GetSolidExtents(elementSolid))
+        for elementSolid in elementSolids
+        if elementSolid.Volume > 0
+    ]
     matchedRooms = []
     for room in rooms:
-        roomSolid = GetSolids(room)[0]
-        for elementSolid in elementSolids:
-            matchedRoom, volume = _TestRoomIntersect(room, elementSolid)
+        for elementSolid, solidExtents in elementSolidExtents:
+            matchedRoom, volume = _TestRoomIntersect(
+                room, elementSolid, roomGeometry, solidExtents
+            )
             if matchedRoom:
                 matchedRooms.append(matchedRoom)
 
     if not matchedRooms:
         LOGGER.info("No Matches: Getting dependent elements and trying again")
         for room in rooms:
-            roomSolid = GetSolids(room)[0]
+            roomSolid, roomExtents = _GetRoomGeometry(room, roomGeometry)
             dependentElements = element.GetDependentElements(
                 DB.ElementIntersectsSolidFilter(roomSolid)
             )
@@ -982,14 +1546,26 @@ def _GetMatchingRooms(element, elementSolids, elementOutline, rooms):
         elementSolid = MakeSolid(
             elementOutline.MinimumPoint, elementOutline.MaximumPoint
         )
-        roomMatchVolumes = {}
-        for room in rooms:
-            matchedRoom, volume = _TestRoomIntersect(room, elementSolid)
-            if matchedRoom:
-                roomMatchVolumes[volume] = room
+        outlineExtents = _GetExtents(
+            elementOutline.MinimumPoint, elementOutline.MaximumPoint
+        )
         # get the room with the largest volume
-        if roomMatchVolumes:
-            matchedRooms = [roomMatchVolumes[max(roomMatchVolumes.keys())]]
+        largestRoom = None
+        largestVolume = 0.0
+        for room in rooms:
+            # The intersection can be no larger than the overlap of the
+            # bounding boxes, so skip rooms that cannot beat the current best
+            roomSolid, roomExtents = _GetRoomGeometry(room, roomGeometry)
+            if _ExtentsOverlapVolume(roomExtents, outlineExtents) <= largestVolume:
+                continue
+            matchedRoom, volume = _TestRoomIntersect(
+                room, elementSolid, roomGeometry, outlineExtents
+            )
+            if matchedRoom and volume > largestVolume:
+                largestRoom = matchedRoom
+                largestVolume = volume
+        if largestRoom:
+            matchedRooms = [largestRoom]
 
     return matchedRooms
 
@@ -1005,13 +1581,12 @@ def GetScheduledParameterIds(scheduleView):
     Returns:
         list[DB.ElementId] or None: List of parameter ids found in the schedule
     """
-    fieldOrder = scheduleView.Definition.GetFieldOrder()
-    fields = [
-        scheduleView.Definition.GetField(fieldId)
-        for fieldId in fieldOrder
+    scheduleDefinition = scheduleView.Definition
+    return [
+        scheduleDefinition.GetField(fieldId).ParameterId
+        for fieldId in scheduleDefinition.GetFieldOrder()
         if fieldId is not None
     ]
-    return [field.ParameterId for field in fields]
 
 
 def GetScheduledParameterByName(scheduleView, parameterName, doc=None):
@@ -1028,17 +1603,33 @@ def GetScheduledParameterByName(scheduleView, parameterName, doc=None):
     Returns:
         DB.Parameter: Revit parameter with the provided name
     """
+    return GetScheduledParameterMap(scheduleView, doc=doc).get(parameterName)
+
+
+def GetScheduledParameterMap(scheduleView, doc=None):
+    """Get the parameters included in the provided schedule keyed by name. The
+    map is read from the schedule on every call, so build it once when looking
+    up several names. Where several scheduled parameters share a name the
+    first one is kept.
+
+    Args:
+        scheduleView (DB.ViewSchedule): Schedule view to collect parameters from
+        doc (DB.Document, optional): Revit document that hosts the parameters.
+            Defaults to None.
+
+    Returns:
+        dict: Scheduled parameters keyed by parameter name
+    """
     if doc is None:
         doc = HOST_APP.doc
-    parameterIds = GetScheduledParameterIds(scheduleView=scheduleView)
-    parameters = [doc.GetElement(parameterId) for parameterId in parameterIds]
-    parameterMap = {
-        parameter.Name: parameter for parameter in parameters if parameter is not None
-    }
-    if parameterName in parameterMap:
-        return parameterMap[parameterName]
-    else:
-        return None
+    getElement = doc.GetElement
+    parameterMap = {}
+    for parameterId in GetScheduledParameterIds(scheduleView=scheduleView):
+        parameter = getElement(parameterId)
+        if parameter is not None:
+            # Keep the first scheduled parameter with a given name
+            parameterMap.setdefault(parameter.Name, parameter)
+    return parameterMap
 
 
 def GetAllGroups(includeModelGroups=True, includeDetailGroups=True, doc=None):
@@ -1067,24 +1658,19 @@ def UngroupAllGroups(includeDetailGroups=True, includeModelGroups=True, doc=None
         includeModelGroups=includeModelGroups,
         doc=doc,
     )
-    groupTypes = set(group.GroupType for group in groups)
-    [group.UngroupMembers() for group in groups]
+    groupTypes = set()
+    for group in tuple(groups or ()):
+        groupTypes.add(group.GroupType)
+        group.UngroupMembers()
     return groupTypes
 
 
 def GetAllElementsInModelGroups(doc=None):
     doc = doc or HOST_APP.doc
-    modelGroups = (
-        DB.FilteredElementCollector(doc)
-        .OfCategory(DB.BuiltInCategory.OST_IOSModelGroups)
-        .WhereElementIsNotElementType()
-        .ToElements()
-    )
-    return set(
-        doc.GetElement(memberId)
-        for modelGroup in modelGroups
-        for memberId in modelGroup.GetMemberIds()
-    )
+    # Dedupe the member ids first so each element is only fetched once
+    memberIds = GetAllElementIdsInModelGroups(doc=doc)
+    getElement = doc.GetElement
+    return set(getElement(memberId) for memberId in memberIds)
 
 
 def GetAllElementIdsInModelGroups(doc=None):
@@ -1093,24 +1679,41 @@ def GetAllElementIdsInModelGroups(doc=None):
         DB.FilteredElementCollector(doc)
         .OfCategory(DB.BuiltInCategory.OST_IOSModelGroups)
         .WhereElementIsNotElementType()
-        .ToElements()
-    )
-    return set(
-        memberId for modelGroup in modelGroups for memberId in modelGroup.GetMemberIds()
     )
+    memberIds = set()
+    for modelGroup in modelGroups:
+        memberIds.update(modelGroup.GetMemberIds())
+    return memberIds
+
+
+def _GetParameterByName(element, parameterName):
+    """Get the first parameter of an element matching the provided name. Uses
+    Element.GetParameters, which filters by name on the Revit side rather than
+    walking the whole parameter set like LookupParameter.
+
+    Args:
+        element (DB.Element): Element hosting the parameter
+        parameterName (str): Name of the parameter
+
+    Returns:
+        DB.Parameter: Matching parameter or None if not found
+    """
+    parameters = element.GetParameters(parameterName)
+    if parameters.Count > 0:
+        return parameters[0]
+    return None
 
 
 def SetParameter(element, parameterName, value):
     LOGGER.debug("SetParameter(element={},{},{})".format(element, parameterName, value))
-    if type(parameterName) == Guid:
-        LOGGER.debug("ParameterName is a Guid")
-        parameter = element.get_Parameter(parameterName)
-    elif type(parameterName) == DB.BuiltInParameter:
-        LOGGER.debug("ParameterName is a BuiltInParameter")
+    if isinstance(parameterName, (Guid, DB.BuiltInParameter)):
         parameter = element.get_Parameter(parameterName)
     else:
-        parameter = element.LookupParameter(parameterName)
-    assert parameter
+        parameter = _GetParameterByName(element, parameterName)
+    if not parameter:
+        raise PyRevitException(
+            "Could not locate parameter on element: {}".format(parameterName)
+        )
     parameter.Set(value)
     return parameter
 
@@ -1120,29 +1723,19 @@ def GetParameterValue(parameter, asValueString=False):
     if asValueString == True:
         LOGGER.debug("AsValueString")
         return parameter.AsValueString()
-    storageType = parameter.StorageType
-    if storageType == DB.StorageType.Integer:
-        LOGGER.debug("AsInteger")
-        return parameter.AsInteger()
-    elif storageType == DB.StorageType.Double:
-        LOGGER.debug("AsDouble")
-        return parameter.AsDouble()
-    elif storageType == DB.StorageType.String:
-        LOGGER.debug("AsString")
-        return parameter.AsString()
-    elif storageType == DB.StorageType.ElementId:
-        LOGGER.debug("AsElementId")
-        return parameter.AsElementId()
-    LOGGER.debug("No matching storage type")
-    return
+    getValue = _PARAMETER_VALUE_GETTERS.get(parameter.StorageType)
+    if getValue is None:
+        LOGGER.debug("No matching storage type")
+        return
+    return getValue(parameter)
 
 
 def GetParameterValueByName(element, parameterName, asValueString=False):
     LOGGER.debug("GetParameterValueByName")
-    if type(parameterName) == Guid or type(parameterName) == DB.BuiltInParameter:
+    if isinstance(parameterName, (Guid, DB.BuiltInParameter)):
         parameter = element.get_Parameter(parameterName)
     else:
-        parameter = element.LookupParameter(parameterName)
+        parameter = _GetParameterByName(element, parameterName)
     if parameter:
         return GetParameterValue(parameter, asValueString=asValueString)
     return
@@ -1184,7 +1777,7 @@ def CopyParameterValue(element, source, destination):
     if type(destination) is not Guid:
         destination = Guid(destination)
     if type(source) is str:
-        sourceParameter = element.LookupParameter(source)
+        sourceParameter = _GetParameterByName(element, source)
     else:
         sourceParameter = element.get_Parameter(source)
     destinationParameter = element.get_Parameter(destination)
@@ -1193,14 +1786,10 @@ def CopyParameterValue(element, source, destination):
     if destinationParameter is None:
         return
     try:
-        if sourceParameter.StorageType == DB.StorageType.Double:
-            value = sourceParameter.AsDouble()
-        elif sourceParameter.StorageType == DB.StorageType.Integer:
-            value = sourceParameter.AsInteger()
-        elif sourceParameter.StorageType == DB.StorageType.ElementId:
-            value = sourceParameter.AsElementId()
-        else:
-            value = sourceParameter.AsString()
+        getValue = _PARAMETER_VALUE_GETTERS.get(
+            sourceParameter.StorageType, DB.Parameter.AsString
+        )
+        value = getValue(sourceParameter)
         LOGGER.debug("value = {}".format(value))
         destinationParameter.Set(value or "")
     except (AttributeError, TypeError) as e:
@@ -1208,6 +1797,27 @@ def CopyParameterValue(element, source, destination):
     return destinationParameter
 
 
+def _GetVisibleModelCategoryIds(doc):
+    """Get the ids of the model categories of a document that are visible in the
+    UI. The ids are cached per document as they do not change during a session.
+
+    Args:
+        doc (DB.Document): Revit document
+
+    Returns:
+        list[DB.ElementId]: Ids of model categories that are visible in the UI
+    """
+    cacheKey = doc.GetHashCode()
+    if cacheKey not in _VISIBLE_MODEL_CATEGORY_IDS:
+        _VISIBLE_MODEL_CATEGORY_IDS[cacheKey] = [
+            category.Id
+            for category in doc.Settings.Categories
+            if category.CategoryType == DB.CategoryType.Model
+            and (not _CATEGORY_HAS_IS_VISIBLE_IN_UI or category.IsVisibleInUI)
+        ]
+    return _VISIBLE_MODEL_CATEGORY_IDS[cacheKey]
+
+
 def GetElementsVisibleInView(
     view=None, IncludeLinkModelElements=True, displayGeometry=False
 ):
@@ -1222,95 +1832,92 @@ def GetElementsVisibleInView(
         .WhereElementIsNotElementType()
         .ToElements()
     )
-    print("View Element Count: {}".format(len(elements)))
+    LOGGER.debug("View Element Count: {}".format(len(elements)))
     if IncludeLinkModelElements:
-        categories = doc.Settings.Categories
-        viewPhase = GetViewPhase(view)
-        print("len(elements) = {}".format(len(elements)))
-        visibleModelCategories = []
-        for category in categories:
-            try:
-                if category.IsVisibleInUI:
-                    if category.CategoryType == DB.CategoryType.Model:
-                        visibleModelCategories.append(category)
-            except Exception as e:
-                print(e)
-        viewModelCategories = List[DB.BuiltInCategory](
-            [
-                category.Id.IntegerValue
-                for category in visibleModelCategories
-                if not view.GetCategoryHidden(category.Id)
-            ]
-        )
-        print("len(viewModelCategories) = {}".format(len(viewModelCategories)))
-        viewBoundingBox = view.GetSectionBox()
         rvtLinks = (
             DB.FilteredElementCollector(doc, view.Id)
             .OfCategory(DB.BuiltInCategory.OST_RvtLinks)
             .ToElements()
         )
+        if rvtLinks.Count == 0:
+            LOGGER.debug("No links visible in view")
+            return elements
+        viewPhase = GetViewPhase(view, doc=doc)
+        viewModelCategories = List[DB.BuiltInCategory]()
+        for categoryId in _GetVisibleModelCategoryIds(doc):
+            if not view.GetCategoryHidden(categoryId):
+                viewModelCategories.Add(categoryId.IntegerValue)
+        LOGGER.debug("len(viewModelCategories) = {}".format(len(viewModelCategories)))
+        viewModelCategoryFilter = DB.ElementMulticategoryFilter(viewModelCategories)
+        elements = list(elements)
+        linkGeometry = []
+        # Link phases keyed by link type id as instances of a type share a map
+        viewPhaseId = viewPhase.Id
+        linkPhaseIds = {}
         for rvtLink in rvtLinks:
             linkDoc = rvtLink.GetLinkDocument()
             linkOffset = rvtLink.GetTotalTransform().Origin
-            print("linkOffset = {}".format(linkOffset))
-            rvtLinkType = doc.GetElement(rvtLink.GetTypeId())
-            phaseMap = rvtLinkType.GetPhaseMap()
-            linkPhaseId = phaseMap.TryGetValue(viewPhase.Id)[1]
-            print(type(linkPhaseId))
-            print(linkPhaseId)
-            elementOnPhaseStatusFilter = DB.ElementPhaseStatusFilter(
-                linkPhaseId,
-                List[DB.ElementOnPhaseStatus](
-                    [
-                        DB.ElementOnPhaseStatus.New,
-                        DB.ElementOnPhaseStatus.Existing,
-                    ]
-                ),
-            )
+            LOGGER.debug("linkOffset = {}".format(linkOffset))
+            rvtLinkTypeId = rvtLink.GetTypeId().IntegerValue
+            if rvtLinkTypeId not in linkPhaseIds:
+                rvtLinkType = doc.GetElement(rvtLink.GetTypeId())
+                phaseMap = rvtLinkType.GetPhaseMap()
+                linkPhaseIds[rvtLinkTypeId] = phaseMap.TryGetValue(viewPhaseId)[1]
+            linkPhaseId = linkPhaseIds[rvtLinkTypeId]
+            LOGGER.debug("linkPhaseId = {}".format(linkPhaseId))
+            linkPhaseKey = (linkDoc.GetHashCode(), linkPhaseId.IntegerValue)
+            if linkPhaseKey not in _PHASE_STATUS_FILTERS:
+                _PHASE_STATUS_FILTERS[linkPhaseKey] = DB.ElementPhaseStatusFilter(
+                    linkPhaseId, _VISIBLE_PHASE_STATUSES
+                )
+            elementOnPhaseStatusFilter = _PHASE_STATUS_FILTERS[linkPhaseKey]
             linkElements = (
                 DB.FilteredElementCollector(linkDoc)
                 .WhereElementIsNotElementType()
                 .WherePasses(elementOnPhaseStatusFilter)
-                .WherePasses(DB.ElementMulticategoryFilter(viewModelCategories))
+                .WherePasses(viewModelCategoryFilter)
                 .ToElements()
             )
-            print("len(linkElements) = {}".format(len(linkElements)))
-            elements = list(elements) + list(linkElements)
+            LOGGER.debug("len(linkElements) = {}".format(len(linkElements)))
+            elements.extend(linkElements)
 
             if displayGeometry:
-                print("Displaying geometry")
-                with revit.Transaction("Add direct shapes"):
+                linkGeometry.append((linkElements, linkOffset))
+
+        if linkGeometry:
+            LOGGER.debug("Displaying geometry")
+            genericModelId = DB.ElementId(DB.BuiltInCategory.OST_GenericModel)
+            with revit.Transaction("Add direct shapes"):
+                for linkElements, linkOffset in linkGeometry:
+                    if linkOffset.IsAlmostEqualTo(DB.XYZ.Zero):
+                        linkTranslation = None
+                    else:
+                        linkTranslation = DB.Transform.CreateTranslation(linkOffset)
                     for element in linkElements:
                         try:
-                            solids = GetSolids(element)
                             translatedSolids = List[DB.GeometryObject]()
-                            if linkOffset.IsAlmostEqualTo(DB.XYZ.Zero):
-                                translatedSolids = solids
-                            else:
-                                for solid in solids:
-                                    if not solid:
-                                        continue
-                                    translatedSolid = DB.SolidUtils.CreateTransformed(
-                                        solid,
-                                        DB.Transform.CreateTranslation(linkOffset),
+                            for solid in GetSolids(element):
+                                if not solid:
+                                    continue
+                                if linkTranslation is not None:
+                                    solid = DB.SolidUtils.CreateTransformed(
+                                        solid, linkTranslation
                                     )
-                                    translatedSolids.Add(translatedSolid)
-                            if translatedSolids:
+                                translatedSolids.Add(solid)
+                            if translatedSolids.Count > 0:
                                 directShape = DB.DirectShape.CreateElement(
-                                    doc,
-                                    DB.ElementId(DB.BuiltInCategory.OST_GenericModel),
+                                    doc, genericModelId
                                 )
                                 directShape.SetShape(translatedSolids)
                         except Exception as e:
-                            print("solid exception: {}".format(e))
+                            LOGGER.debug("solid exception: {}".format(e))
 
-        print("View + Links Element Count: {}".format(len(elements)))
+        LOGGER.debug("View + Links Element Count: {}".format(len(elements)))
 
     return elements
 
 
 def ExportScheduleAsDictionary(viewSchedule):
-    LOGGER.set_debug_mode()
     LOGGER.info("flamingo.revit.ExportScheduleAsDictionary")
     LOGGER.debug(
         "viewSchedule.Id.IntegerValue = {}".format(viewSchedule.Id.IntegerValue)
@@ -1322,6 +1929,7 @@ def ExportScheduleAsDictionary(viewSchedule):
     #  DB.SectionType.Footer
     dictionary = []
     if type(viewSchedule) == DB.ViewSchedule:
+        doc = viewSchedule.Document
         tableData = viewSchedule.GetTableData()
         LOGGER.info("NumberOfSections = {}".format(tableData.NumberOfSections))
         for i in range(tableData.NumberOfSections):
@@ -1332,48 +1940,85 @@ def ExportScheduleAsDictionary(viewSchedule):
             LOGGER.debug(
                 "sectionData.NumberOfRows = {}".format(sectionData.NumberOfRows)
             )
+            numberOfColumns = sectionData.NumberOfColumns
             for x in range(sectionData.NumberOfRows):
-                rowData = []
-                for y in range(sectionData.NumberOfColumns):
-                    cellText = GetCellValueAsText(sectionData, x, y)
-                    calculatedValue = sectionData.GetCellCalculatedValue(x, y)
-                    cellType = sectionData.GetCellType(x, y)
-                    LOGGER.debug(
-                        "cell {},{} = {} ({})".format(x, y, cellText, cellType)
-                    )
-                    rowData.append(cellText)
+                rowData = [None] * numberOfColumns
+                for y in range(numberOfColumns):
+                    rowData[y] = GetCellValueAsText(sectionData, x, y, doc=doc)
                 dictionary.append(rowData)
     return dictionary
 
 
+def _GetCellText(sectionData, x, y, doc):
+    return sectionData.GetCellText(x, y)
+
+
+def _GetCellParameterValue(sectionData, x, y, doc):
+    parameterId = sectionData.GetCellParamId(x, y).IntegerValue
+    LOGGER.debug("parameterId = {}".format(parameterId))
+    return GetParameterValue(doc.GetElement(parameterId))
+
+
+def _GetCellCalculatedValue(sectionData, x, y, doc):
+    return sectionData.GetCellCalculatedValue(x, y)
+
+
+def _GetCellInherited(sectionData, x, y, doc):
+    return "INHERITED"
+
+
+def _GetCellCombinedParameters(sectionData, x, y, doc):
+    combinedParameters = sectionData.GetCellCombinedParameters(x, y)
+    LOGGER.debug("combinedParameters = {}".format(combinedParameters))
+    return "COMBINED PARAMETERS"
+
+
+# Cell value getters keyed by schedule cell type
+_CELL_VALUE_GETTERS = {
+    DB.CellType.Text: _GetCellText,
+    DB.CellType.ParameterText: _GetCellText,
+    DB.CellType.Parameter: _GetCellParameterValue,
+    DB.CellType.CalculatedValue: _GetCellCalculatedValue,
+    DB.CellType.Inherited: _GetCellInherited,
+    DB.CellType.CombinedParameter: _GetCellCombinedParameters,
+}
+
+
 def GetCellValueAsText(sectionData, x, y, doc=None):
     doc = doc or HOST_APP.doc
-    LOGGER.info("flamingo.revit.GetCellValueAsText")
-    cellType = sectionData.GetCellType(x, y)
-    if cellType in (DB.CellType.Text, DB.CellType.ParameterText):
-        LOGGER.debug("Getting text")
-        return sectionData.GetCellText(x, y)
-    elif cellType == DB.CellType.Parameter:
-        LOGGER.debug("Getting parameter")
-        parameterId = sectionData.GetCellParamId(x, y).IntegerValue
-        LOGGER.debug("type(parameterId) = {}".format(type(parameterId)))
-        LOGGER.debug(
-            "doc.GetElement(parameterId) = {}".format(doc.GetElement(parameterId))
+    getCellValue = _CELL_VALUE_GETTERS.get(sectionData.GetCellType(x, y))
+    if getCellValue is None:
+        return
+    return getCellValue(sectionData, x, y, doc)
+
+
+def _ParseJournalTimestamp(timestamp):
+    """Parse a journal timestamp like "24-Oct-2022 13:39:40.220". Splits the
+    fixed journal format directly rather than going through strptime, falling
+    back to strptime if the timestamp is not in the expected shape.
+
+    Args:
+        timestamp (str): Timestamp from a journal 'C line
+
+    Returns:
+        datetime: Parsed timestamp
+    """
+    try:
+        date, time = timestamp.split(" ")
+        day, month, year = date.split("-")
+        time, fraction = time.split(".")
+        hour, minute, second = time.split(":")
+        return datetime(
+            int(year),
+            _JOURNAL_MONTHS[month],
+            int(day),
+            int(hour),
+            int(minute),
+            int(second),
+            int(fraction[:6].ljust(6, "0")),
         )
-        return GetParameterValue(doc.GetElement(parameterId))
-    elif cellType == DB.CellType.CalculatedValue:
-        LOGGER.debug("Getting calculated value")
-        return sectionData.GetCellCalculatedValue(x, y)
-    elif cellType == DB.CellType.Inherited:
-        LOGGER.debug("Getting inherited")
-        return "INHERITED"
-    elif cellType == DB.CellType.CombinedParameter(x, y):
-        LOGGER.debug("Getting Combined Parameters")
-        combinedParameters = sectionData.GetCellCombinedParameters(x, y)
-        cellValue = ""
-        LOGGER.debug("combinedParameters = {}".format(combinedParameters))
-        return "COMBINED PARAMETERS"
-    return
+    except (KeyError, ValueError):
+        return datetime.strptime(timestamp, "%d-%b-%Y %H:%M:%S.%f")
 
 
 def GetLinkLoadTimes(logFilePath=None, doc=None):
@@ -1383,56 +2028,48 @@ def GetLinkLoadTimes(logFilePath=None, doc=None):
     LOGGER.debug("doc.Title = {}".format(doc.Title))
     out = {}
     with open(logFilePath, "r") as f:
-        currentTimestamp = None
-        currentJournalC = None
-        activeDocumentPath = None
-        detach = False
-        processNextLine = False
-        for lineNumber, line in enumerate(f):
-            if processNextLine:
-                processNextLine = False
-                m = re.search(r"([^\\]+?\.rvt)", line)
-                if detach:
-                    detach = False
-                    filePath = "{}_detached.rvt".format(m.group(1)[0:-4])
-                else:
-                    filePath = m.group(1)
-                activeDocumentPath = filePath
-                continue
-            m = re.search(r"'C (.*);\s+(.*)", line.strip())
-            if m:
-                currentTimestamp = m.group(1)
-                currentJournalC = m.group(2)
-                continue
-            if '"DetachCheckBox", "True"' in line:
-                detach = True
-                LOGGER.debug("detach = {}".format(detach))
-                continue
-            if 'Jrn.Data "File Name"' in line:
-                processNextLine = True
-                continue
-            m = re.search(r'>Open:Local.*".+\\(.+)"', line)
-            if m:
-                activeDocumentPath = m.group(1)
-                continue
-            m = re.search(r'"\[(.*)\]"', line)
-            if m:
-                activeDocumentPath = m.group(1)
-                continue
-            m = re.search(r"openFromModelPath.+\[(.*)\]", line)
-            if m:
-                # LOGGER.debug(
-                #     "{}: {} {}|{}".format(
-                #         lineNumber, currentTimestamp, activeDocumentPath, m.group(1)
-                #     )
-                # )
-                # documentLoad = (currentTimestamp, m.group(1))
-                # 'C 24-Oct-2022 13:39:40.220;  ->desktop InitApplication
-                timestamp = datetime.strptime(currentTimestamp, "%d-%b-%Y %H:%M:%S.%f")
-                if activeDocumentPath in out:
-                    out[activeDocumentPath][m.group(1)] = timestamp
-                else:
-                    out[activeDocumentPath] = {m.group(1): timestamp}
+        lines = f.read().splitlines()
+    currentTimestamp = None
+    currentDateTime = None
+    currentJournalC = None
+    activeDocumentPath = None
+    detach = False
+    processNextLine = False
+    for line in lines:
+        if processNextLine:
+            processNextLine = False
+            m = _JOURNAL_FILE_NAME_REGEX.search(line)
+            if detach:
+                detach = False
+                filePath = "{}_detached.rvt".format(m.group(1)[0:-4])
+            else:
+                filePath = m.group(1)
+            activeDocumentPath = filePath
+            continue
+        lineType, m = ClassifyJournalLine(line)
+        if lineType is None:
+            continue
+        if lineType == "command":
+            currentTimestamp = m.group(1)
+            currentDateTime = None
+            currentJournalC = m.group(2)
+        elif lineType == "detach":
+            detach = True
+            LOGGER.debug("detach = {}".format(detach))
+        elif lineType == "fileName":
+            processNextLine = True
+        elif lineType in ("openLocal", "bracket"):
+            activeDocumentPath = m.group(1)
+        else:
+            # 'C 24-Oct-2022 13:39:40.220;  ->desktop InitApplication
+            # Only timestamps followed by a link load are parsed, once each
+            if currentDateTime is None:
+                currentDateTime = _ParseJournalTimestamp(currentTimestamp)
+            modelPath = m.group(1)
+            if activeDocumentPath in out:
+                out[activeDocumentPath][modelPath] = currentDateTime
+            else:
+                out[activeDocumentPath] = {modelPath: currentDateTime}
     return out
 
 
@@ -1477,12 +2114,18 @@ def OperateOnNestedFamilies(
     prefix = "\t" * nestLevel
     LOGGER.debug("{}OperateOnNestedFamilies: Nest level {}".format(prefix, nestLevel))
     LOGGER.debug("{}includeShared = {}".format(prefix, includeShared))
+    if nestLevel > maxNest:
+        raise PyRevitException(
+            "Reached max nest level of {}. If more nesting is required"
+            ' set the "maxNest" parameter'.format(maxNest)
+        )
+    visitedFamilyIds = set()
     for family in families:
-        if nestLevel > maxNest:
-            raise PyRevitException(
-                "Reached max nest level of {}. If more nesting is required"
-                ' set the "maxNest" parameter'.format(maxNest)
-            )
+        familyId = family.Id.IntegerValue
+        if familyId in visitedFamilyIds:
+            LOGGER.debug("{}Family already processed".format(prefix))
+            continue
+        visitedFamilyIds.add(familyId)
         LOGGER.debug("{}family.Name = {}".format(prefix, family.Name))
         if "{}.rfa".format(family.Name) == doc.Title:
             LOGGER.warn(
@@ -1529,9 +2172,7 @@ def OperateOnNestedFamilies(
                 **kwargs
             )
             if processedFamilyNamesFromNests:
-                processedFamilyNames = (
-                    processedFamilyNames + processedFamilyNamesFromNests
-                )
+                processedFamilyNames.extend(processedFamilyNamesFromNests)
 
         LOGGER.debug("{}Loading family back in: {}".format(prefix, familyDoc.Title))
         familyDoc.LoadFamily(doc, iFamilyLoadOptions())
@@ -1543,6 +2184,10 @@ def OperateOnNestedFamilies(
                 LOGGER.warn("{}Unable to close family: {}".format(prefix, e))
     for error in swallowedErrors:
         print(error)
+    if nestLevel == 0 and closeDocs and processedFamilyNames:
+        # Release the API wrappers of every family document closed above in
+        # one pass once the whole tree is done
+        doc.Application.PurgeReleasedAPIObjects()
     return processedFamilyNames
 
 
@@ -1593,10 +2238,22 @@ def GetElementSymbolId(element):
 
 def GetSolidFillId(doc):
     LOGGER.debug("GetSolidFillId({})".format(doc))
-    fillPatternElements = (
-        DB.FilteredElementCollector(doc).OfClass(DB.FillPatternElement).ToElements()
+    cacheKey = doc.GetHashCode()
+    solidFillId = _SOLID_FILL_IDS.get(cacheKey)
+    if solidFillId is not None:
+        # Hash codes can be reused and ids can be taken by other elements, so
+        # only trust a cached id that still points at a solid fill pattern
+        cachedElement = doc.GetElement(solidFillId)
+        if (
+            isinstance(cachedElement, DB.FillPatternElement)
+            and cachedElement.GetFillPattern().IsSolidFill
+        ):
+            return solidFillId
+    fillPatternElements = DB.FilteredElementCollector(doc).OfClass(
+        DB.FillPatternElement
     )
     for fillPatternElement in fillPatternElements:
         if fillPatternElement.GetFillPattern().IsSolidFill:
+            _SOLID_FILL_IDS[cacheKey] = fillPatternElement.Id
             return fillPatternElement.Id
     return
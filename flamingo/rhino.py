@@ -1,5 +1,6 @@
 from pyrevit import script
 import clr
+import logging
 
 # Get logger and output from script
 LOGGER = script.get_logger()
@@ -12,40 +13,53 @@ from Rhino import RhinoDoc, DocObjects
 
 # Function to find or add a layer in Rhino
 def FindOrAddRhinoLayer(layerFullPath, rhinoDoc=None):
+    # Only build debug messages when they will be logged
+    debug = LOGGER.isEnabledFor(logging.DEBUG)
     # Log the function call
-    LOGGER.debug(
-        "FindOrAddRhinoLayer(layerFullPath={}, rhinoDoc={})".format(
-            layerFullPath, rhinoDoc
+    if debug:
+        LOGGER.debug(
+            "FindOrAddRhinoLayer(layerFullPath={}, rhinoDoc={})".format(
+                layerFullPath, rhinoDoc
+            )
         )
-    )
     # If no document is provided, use the active document
     rhinoDoc = rhinoDoc or RhinoDoc.ActiveDoc
     # Try to find the layer by its full path
     layerIndex = rhinoDoc.Layers.FindByFullPath(layerFullPath, -1)
     # If the layer is found, return its index
     if not layerIndex < 0:
-        LOGGER.debug("Layer Found: layerIndex = {}".format(layerIndex))
+        if debug:
+            LOGGER.debug("Layer Found: layerIndex = {}".format(layerIndex))
         return layerIndex
-    # If the layer is not found, split the full path into individual layer names
-    layerNameSplit = layerFullPath.split("::")
+    # If the layer is not found, walk down the path one layer name at a time
+    currentPath = None
     parentLayerId = None
+    # Once a layer is missing, every layer below it is missing too
+    layerMissing = False
     # Iterate over the layer names
-    for i, layerName in enumerate(layerNameSplit):
-        # Construct the current path
-        currentPath = "::".join(layerNameSplit[0 : i + 1])
-        LOGGER.debug("currentPath = {}".format(currentPath))
-        # Try to find the layer by the current path
-        layerIndex = rhinoDoc.Layers.FindByFullPath(currentPath, -1)
-        LOGGER.debug("parentLayerId = {}".format(parentLayerId))
-        # If the layer is found, get its parent layer
-        if not layerIndex < 0:
-            LOGGER.debug("Matched: layerIndex = {}".format(layerIndex))
-            parentLayer = rhinoDoc.Layers.FindIndex(layerIndex)
-            LOGGER.debug("type(parentLayer) = {}".format(type(parentLayer)))
-            LOGGER.debug("parentLayer.Id = {}".format(parentLayer.Id))
-            # Set the parent layer id for the next iteration
-            parentLayerId = parentLayer.Id
-            continue
+    for layerName in layerFullPath.split("::"):
+        # Extend the current path by one layer
+        if currentPath is None:
+            currentPath = layerName
+        else:
+            currentPath = currentPath + "::" + layerName
+        if debug:
+            LOGGER.debug("currentPath = {}".format(currentPath))
+            LOGGER.debug("parentLayerId = {}".format(parentLayerId))
+        if not layerMissing:
+            # Try to find the layer by the current path
+            layerIndex = rhinoDoc.Layers.FindByFullPath(currentPath, -1)
+            # If the layer is found, get its parent layer
+            if not layerIndex < 0:
+                parentLayer = rhinoDoc.Layers.FindIndex(layerIndex)
+                if debug:
+                    LOGGER.debug("Matched: layerIndex = {}".format(layerIndex))
+                    LOGGER.debug("type(parentLayer) = {}".format(type(parentLayer)))
+                    LOGGER.debug("parentLayer.Id = {}".format(parentLayer.Id))
+                # Set the parent layer id for the next iteration
+                parentLayerId = parentLayer.Id
+                continue
+            layerMissing = True
         # If the layer is not found, create a new layer
         childLayer = DocObjects.Layer()
         childLayer.Name = layerName
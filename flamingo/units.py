@@ -1,57 +1,46 @@
 import re
 
+# Each alternative has its own group names so the pattern also compiles
+# outside of IronPython
+_FOOT_INCH_REGEX = re.compile(
+    r"^\s*(?P<minus>-)?\s*("
+    r"(((?P<feet>[\d.]+)')[\s-]*"
+    r"((?P<inch>[\d.]+)?[\s-]*"
+    r"((?P<numer>\d+)/(?P<denom>\d+))?\"?)?)|"
+    r"(((?P<inchOnly>[\d.]+)?[\s-]*"
+    r"((?P<numerOnly>\d+)/(?P<denomOnly>\d+))?\")?)|"
+    r"((?P<feetSpaced>[\d.]+)([\s-]+(?P<inchSpaced>[\d.]+))?"
+    r"([\s-]+(?P<numerSpaced>\d+)/(?P<denomSpaced>\d+))?)" #if only spaces are entered
+    r")\s*$"
+)
+
 def FeetInchToFloat(lengthString):
-    footInchPattern = re.compile(
-        r"^\s*(?P<minus>-)?\s*("
-        r"(((?P<feet>[\d.]+)')[\s-]*"
-        r"((?P<inch>[\d.]+)?[\s-]*"
-        r"((?P<numer>\d+)/(?P<denom>\d+))?\"?)?)|"
-        r"(((?P<inch>[\d.]+)?[\s-]*"
-        r"((?P<numer>\d+)/(?P<denom>\d+))?\")?)|"
-        r"((?P<feet>[\d.]+)([\s-]+(?P<inch>[\d.]+))?"
-        r"([\s-]+(?P<numer>\d+)/(?P<denom>\d+))?)" #if only spaces are entered
-        r")\s*$"
-    )
-    match = footInchPattern.search(lengthString)
-    lengthFloat = None
-    if match:
-        matches = match.groupdict()
-        for key, value in matches.items():
-            if key == "minus":
-                if value == "-":
-                    matches[key] = -1
-                else:
-                    matches[key] = 1
-            if key in ["feet", "inch", "numer", "denom"]:
-                if value is None:
-                    if key == "denom":
-                        matches[key] = 1
-                    else:
-                        matches[key] = 0
-                else:
-                    matches[key] = float(value)
-        lengthFloat = (
-            matches["feet"] + (
-                (matches["inch"] + (matches["numer"]/matches["denom"])) / 12
-            )
-        ) * matches["minus"]
+    match = _FOOT_INCH_REGEX.search(lengthString)
+    if not match:
+        return None
+    matches = match.groupdict()
+    feet = matches["feet"] or matches["feetSpaced"] or 0
+    inch = matches["inch"] or matches["inchOnly"] or matches["inchSpaced"] or 0
+    numer = matches["numer"] or matches["numerOnly"] or matches["numerSpaced"] or 0
+    denom = matches["denom"] or matches["denomOnly"] or matches["denomSpaced"] or 1
+    lengthFloat = float(feet) + ((float(inch) + (float(numer) / float(denom))) / 12)
+    if matches["minus"]:
+        return -lengthFloat
     return lengthFloat
 
 def FloatToFeetInchString(lengthFloat):
-    feet = int(lengthFloat)
-    lengthInches = abs(lengthFloat * 12)
-    inches = lengthInches % 12
-    remainder = round(inches, 5) - int(inches)
-    remainderCheckCount = 0
-    while remainder != 0 and remainderCheckCount < 8:
-        remainderCheckCount += 1
-        denominator = pow(2, remainderCheckCount)
-        lengthFraction = lengthInches * denominator
-        numerator = lengthFraction % denominator
-        remainder = round(numerator, 5) - int(numerator)
-    if numerator and numerator > 0:
-        fraction = " {}/{}".format(int(numerator), int(denominator))
+    # Work in whole 256ths of an inch so the fraction reduces with bit shifts
+    lengthFractions = int(round(abs(lengthFloat) * 12 * 256))
+    feet, lengthFractions = divmod(lengthFractions, 12 * 256)
+    inches, numerator = divmod(lengthFractions, 256)
+    if numerator:
+        denominator = 256
+        while not numerator & 1:
+            numerator >>= 1
+            denominator >>= 1
+        fraction = " {}/{}".format(numerator, denominator)
     else:
         fraction = ""
-    lengthString = "{}'-{}{}\"".format(feet, int(inches), fraction)
-    return lengthString
\ No newline at end of file
+    sign = "-" if lengthFloat < 0 and (feet or inches or numerator) else ""
+    lengthString = "{}{}'-{}{}\"".format(sign, feet, inches, fraction)
+    return lengthString
@@ -1,15 +1,31 @@
 from datetime import datetime
 import tempfile
+import os
 import shutil
 import re
-import codecs
+import io
+
+# Session detail lines like ' host="..."'
+_SESSION_VALUE_REGEX = re.compile(r" (.+)=.*\"(.*)\"")
+# Synchronize with central lines
+_SYNC_REGEX = re.compile(r"<STC[^:]")
+# Read size used when parsing sLog files
+_SLOG_BUFFER_SIZE = 1024 * 1024
 
 def TimestampAsDateTime(string):
-    return datetime.strptime(
-        string[10:29],
-        format="%Y-%m-%d %H:%M:%S"
+    # sLog lines hold a fixed "%Y-%m-%d %H:%M:%S" timestamp at [10:29]
+    return datetime(
+        int(string[10:14]),
+        int(string[15:17]),
+        int(string[18:20]),
+        int(string[21:23]),
+        int(string[24:26]),
+        int(string[27:29]),
     )
 
+def _OpenSLog(slogPath):
+    return io.open(slogPath, "r", encoding="UTF-16", buffering=_SLOG_BUFFER_SIZE)
+
 def OutputMD(output, string, printReport=True):
     if printReport:
         output.print_md(string)
@@ -25,60 +41,71 @@ def GetWorksharingReport(slogPath, output, printReport):
     Returns:
         [type]: [description]
     """
-    fd, tempPath = tempfile.mkstemp()
-    shutil.copy2(slogPath, tempPath)
+    tempPath = None
+    try:
+        f = _OpenSLog(slogPath)
+    except (IOError, OSError):
+        # Revit can hold the log open exclusively, so read from a copy
+        fd, tempPath = tempfile.mkstemp()
+        os.close(fd)
+        shutil.copy2(slogPath, tempPath)
+        f = _OpenSLog(tempPath)
 
     sessions = {}
     currentSessionId = None
+    currentSession = None
     minStart = datetime.max
     maxEnd = datetime.now()
-    with codecs.open(tempPath, "r", encoding="UTF-16") as f:
-        for line in f:
-            if line.startswith(" ") and currentSessionId:
-                m = re.match(r" (.+)=.*\"(.*)\"", line)
-                if m:
-                    sessions[currentSessionId][m.group(1)] = m.group(2)
-            elif re.findall(r">Session", line):
-                currentSessionId = line[0:9]
-                startDateTime = TimestampAsDateTime(line)
-                sessions[currentSessionId] = {"start": startDateTime}
-                minStart = startDateTime if startDateTime < minStart \
-                    else minStart
-            elif re.findall(r"<Session", line) and currentSessionId:
-                currentSessionId = line[0:9]
-                endDateTime = TimestampAsDateTime(line)
-                sessions[currentSessionId]['end'] = endDateTime
-            elif re.findall(r"<STC[^:]", line):
-                sessions[currentSessionId]['lastSync'] = TimestampAsDateTime(
-                    line
-                )
-            elif line[0:9] in sessions:
-                sessions[currentSessionId]['lastActive'] = TimestampAsDateTime(
-                    line
-                )
+    try:
+        with f:
+            for line in f:
+                if line.startswith(" ") and currentSessionId:
+                    m = _SESSION_VALUE_REGEX.match(line)
+                    if m:
+                        currentSession[m.group(1)] = m.group(2)
+                elif ">Session" in line:
+                    currentSessionId = line[0:9]
+                    startDateTime = TimestampAsDateTime(line)
+                    currentSession = {"start": startDateTime}
+                    sessions[currentSessionId] = currentSession
+                    minStart = startDateTime if startDateTime < minStart \
+                        else minStart
+                elif "<Session" in line and currentSessionId:
+                    currentSessionId = line[0:9]
+                    currentSession = sessions[currentSessionId]
+                    currentSession['end'] = TimestampAsDateTime(line)
+                elif _SYNC_REGEX.search(line):
+                    currentSession['lastSync'] = TimestampAsDateTime(line)
+                elif line[0:9] in sessions:
+                    currentSession['lastActive'] = TimestampAsDateTime(line)
+    finally:
+        if tempPath:
+            os.remove(tempPath)
 
-    for session in sessions:
-        if "end" in sessions[session]:
-            endDateTime = sessions[session]['end']
+    for sessionInfo in sessions.values():
+        if "end" in sessionInfo:
+            endDateTime = sessionInfo['end']
         else:
             endDateTime = datetime.now()
-            if "lastSync" in sessions[session]:
-                sessions[session]['timeSinceLastSync'] = \
-                    datetime.now() - sessions[session]['lastSync']
-        sessions[session]['sessionLength'] = \
-            endDateTime - sessions[session]['start']
+            if "lastSync" in sessionInfo:
+                sessionInfo['timeSinceLastSync'] = \
+                    datetime.now() - sessionInfo['lastSync']
+        sessionInfo['sessionLength'] = endDateTime - sessionInfo['start']
 
     activeSessions = [
         session for session, sessionInfo in sessions.items()
         if "end" not in sessionInfo
     ]
-    sortedSessionKeys = sorted(
-        sessions,
-        key=lambda x: sessions[x]['start']
-    )
+    sortedSessionKeys = [
+        session for start, session in sorted(
+            (sessionInfo['start'], session)
+            for session, sessionInfo in sessions.items()
+        )
+    ]
+    firstSession = next(iter(sessions.values()), {})
     OutputMD(output, "# Worksharing Log Info", printReport)
     OutputMD(output, "Active: {}".format(maxEnd - minStart), printReport)
-    OutputMD(output, "central: {}".format(list(sessions.values())[0]['central']), printReport)
+    OutputMD(output, "central: {}".format(firstSession.get('central', '')), printReport)
     OutputMD(output, "Total Sessions: {}".format(len(sessions)), printReport)
     OutputMD(output, "Active Sessions: {}".format(len(activeSessions)), printReport)
     OutputMD(output, "", printReport)
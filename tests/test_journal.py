@@ -0,0 +1,66 @@
+import re
+
+import pytest
+
+from flamingo.journal import ClassifyJournalLine
+
+
+def _ClassifyJournalLineOrdered(line):
+    # The checks GetLinkLoadTimes made one after another before they were
+    # moved to flamingo.journal
+    m = re.search(r"'C (.*);\s+(.*)", line.strip())
+    if m:
+        return "command", m.groups()
+    if '"DetachCheckBox", "True"' in line:
+        return "detach", None
+    if 'Jrn.Data "File Name"' in line:
+        return "fileName", None
+    m = re.search(r'>Open:Local.*".+\\(.+)"', line)
+    if m:
+        return "openLocal", m.groups()
+    m = re.search(r'"\[(.*)\]"', line)
+    if m:
+        return "bracket", m.groups()
+    m = re.search(r"openFromModelPath.+\[(.*)\]", line)
+    if m:
+        return "openFromModelPath", m.groups()
+    return None, None
+
+
+JOURNAL_LINES = [
+    "'C 24-Oct-2022 13:39:40.220;  ->desktop InitApplication",
+    "'C 24-Oct-2022 13:39:40.220;",
+    "  'C 24-Oct-2022 13:41:02.118;   0:< openFromModelPath [C:\\x.rvt]",
+    ' Jrn.CheckBox "Modal , Open , Dialog_Revit_Open" _',
+    '   , "DetachCheckBox", "True"',
+    '   , "DetachCheckBox", "False"',
+    ' Jrn.Data "File Name"  _',
+    '   , "IDOK", "C:\\Models\\Central.rvt"',
+    '   "[C:\\Models\\Central.rvt]"',
+    ' Jrn.Command "x" , "openFromModelPath" , "[C:\\x.rvt]"',
+    " 0:< openFromModelPath : [C:\\Links\\Link.rvt]",
+    ' Jrn.Data "File Name" , "openFromModelPath [C:\\x.rvt]"',
+    ' Jrn.Directive "DocSymbol" , ">Open:Local" , "C:\\Users\\me\\Local.rvt"',
+    ' >Open:Local "[C:\\Users\\me\\Local.rvt]"',
+    ' , "DetachCheckBox", "True" , "[C:\\x.rvt]"',
+    "'H 24-Oct-2022 13:39:40.220;",
+    "Jrn.Size 0 , 2218 , 1217",
+    "",
+    "   ",
+]
+
+
+@pytest.mark.parametrize("line", JOURNAL_LINES)
+def test_classify_journal_line_matches_ordered_checks(line):
+    lineType, m = ClassifyJournalLine(line)
+    expectedType, expectedGroups = _ClassifyJournalLineOrdered(line)
+    assert lineType == expectedType
+    assert (m.groups() if m else None) == expectedGroups
+
+
+def test_bracket_line_with_open_from_model_path_is_not_a_link_load():
+    lineType, m = ClassifyJournalLine(
+        ' Jrn.Command "x" , "openFromModelPath" , "[C:\\x.rvt]"'
+    )
+    assert lineType == "bracket"
+    assert m.group(1) == "C:\\x.rvt"